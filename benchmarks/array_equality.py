@@ -0,0 +1,74 @@
+"""
+    Measure the time of the == operator on arrays: large flat arrays, deeply nested arrays,
+    arrays that differ early, and an array compared with itself.
+
+    Usage: python3 -m benchmarks.array_equality [elements] [depth]
+"""
+
+import time
+from sys import argv
+from typing import Callable
+
+import src.arrays as arrays
+from src.operations import equal
+from src.token import Token, TokenType
+from src.utils import SourceCodeLocation
+
+
+LOCATION = SourceCodeLocation(0, 1)
+OPERATOR = Token(TokenType.EQUAL, 0, LOCATION)
+
+
+def build_numbers(count: int) -> arrays.ArrayValue:
+    return arrays.pack([Token(TokenType.NUMBER, 0, LOCATION, number) for number in range(count)])
+
+
+def build_mixed(count: int) -> arrays.ArrayValue:
+    # Strings and numbers alternate, so that the array is kept as a token list
+    return [
+        Token(TokenType.STRING, 0, LOCATION, str(number)) if number % 2 == 0 else Token(TokenType.NUMBER, 0, LOCATION, number)
+        for number in range(count)
+    ]
+
+
+def build_nested(depth: int) -> arrays.ArrayValue:
+    value: arrays.ArrayValue = [Token(TokenType.NUMBER, 0, LOCATION, 0)]
+    for _ in range(depth):
+        value = [Token(TokenType.ARRAY, 0, LOCATION, value), Token(TokenType.NUMBER, 0, LOCATION, 1)]
+    return value
+
+
+def report(name: str, make_value: Callable[[], arrays.ArrayValue], make_other: Callable[[], arrays.ArrayValue]) -> None:
+    value = make_value()
+    other = make_other()
+
+    start = time.perf_counter()
+    result = equal(value, TokenType.ARRAY, other, TokenType.ARRAY, OPERATOR)
+    elapsed = time.perf_counter() - start
+
+    print(f'  {name:<36} {elapsed * 1000:10.3f} ms   {result}')
+
+
+def main() -> None:
+    count = int(argv[1]) if len(argv) > 1 else 1000000
+    depth = int(argv[2]) if len(argv) > 2 else 100000
+
+    def build_mixed_changed() -> arrays.ArrayValue:
+        value = build_mixed(count)
+        value[0] = Token(TokenType.STRING, 0, LOCATION, 'changed')
+        return value
+
+    print(f'Equality of arrays of {count} elements and of arrays nested {depth} levels deep')
+    report('compact arrays, equal', lambda: build_numbers(count), lambda: build_numbers(count))
+    report('compact arrays, different lengths', lambda: build_numbers(count), lambda: build_numbers(count - 1))
+    report('token lists, equal', lambda: build_mixed(count), lambda: build_mixed(count))
+    report('token lists, first element differs', lambda: build_mixed(count), build_mixed_changed)
+    report('compact array and token list, equal', lambda: build_numbers(count), lambda: list(arrays.unpack(build_numbers(count), LOCATION)))
+    report('nested arrays, equal', lambda: build_nested(depth), lambda: build_nested(depth))
+
+    same = build_mixed(count)
+    report('token list with itself', lambda: same, lambda: same)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+    Time a loop full of constant expressions and constant conditions, with and without the optimization pass.
+
+    Usage: python3 -m benchmarks.constant_folding [iterations]
+"""
+
+import time
+from sys import argv
+
+from src.optimizer import optimize_tree
+from src.resolver import resolve_tree
+from src.syntax_tree import SyntaxTree
+from src.tokenizer import tokenize_source_code
+from src.vm import Processor
+
+
+CONSTANT_LOOP_SOURCE = """
+;0 = i
+{
+    ;i ++
+    ;60 60 * 24 * = secondsPerDay
+    ;"seconds" " per " + "day" + = label
+    {
+        ;i 1 + = i
+    } 1 2 > if
+    {
+        ;secondsPerDay 7 * = secondsPerWeek
+    } 10 5 2 * == if
+} i {iterations} < while
+"""
+
+
+def run(iterations: int, optimize: bool) -> float:
+    syntax_tree = SyntaxTree()
+    syntax_tree.parse_tokens(tokenize_source_code(CONSTANT_LOOP_SOURCE.replace('{iterations}', str(iterations))))
+    if optimize:
+        optimize_tree(syntax_tree)
+    resolve_tree(syntax_tree)
+
+    start = time.perf_counter()
+    Processor().interpret_tree(syntax_tree)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    iterations = int(argv[1]) if len(argv) > 1 else 20000
+
+    unoptimized_time = run(iterations, False)
+    optimized_time = run(iterations, True)
+
+    print(f'Constant loop, {iterations} iterations')
+    print(f'  unoptimized:             {unoptimized_time * 1000:.0f} ms')
+    print(f'  optimized:               {optimized_time * 1000:.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
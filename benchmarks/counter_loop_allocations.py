@@ -0,0 +1,106 @@
+"""
+    Count the Token and SourceCodeLocation objects allocated per iteration of a counter loop.
+
+    The tree-walking Processor used to deep-copy every statement, and the loop condition,
+    before evaluating it. This benchmark reports the objects those copies would allocate
+    next to the objects the current, non-mutating evaluation allocates.
+
+    Usage: python3 -m benchmarks.counter_loop_allocations [iterations]
+"""
+
+import copy
+import time
+from sys import argv
+from typing import Callable, Dict
+
+from src.resolver import resolve_tree
+from src.syntax_tree import SyntaxTree
+from src.token import Token, TokenType
+from src.tokenizer import tokenize_source_code
+from src.utils import SourceCodeLocation
+from src.vm import Processor
+
+
+COUNTER_LOOP_SOURCE = """
+;0 = i
+;0 = total
+{
+    ;i ++
+    ;i 2 * += total
+} i {iterations} < while
+"""
+
+
+allocation_counts: Dict[type, int] = {
+    Token: 0,
+    SourceCodeLocation: 0,
+}
+
+
+def counting_new(cls: type, *args, **kwargs) -> object:
+    allocation_counts[cls] += 1
+    return object.__new__(cls)
+
+
+# Both regular construction and copy.deepcopy() go through __new__
+for cls in allocation_counts:
+    cls.__new__ = counting_new
+
+
+def count_allocations(function: Callable[[], None]) -> int:
+    """
+        Return the number of Token and SourceCodeLocation objects allocated by the given function.
+    """
+    for cls in allocation_counts:
+        allocation_counts[cls] = 0
+    function()
+    return sum(allocation_counts.values())
+
+
+def parse(iterations: int) -> SyntaxTree:
+    syntax_tree = SyntaxTree()
+    syntax_tree.parse_tokens(tokenize_source_code(COUNTER_LOOP_SOURCE.replace('{iterations}', str(iterations))))
+    resolve_tree(syntax_tree)
+    return syntax_tree
+
+
+def run(syntax_tree: SyntaxTree) -> None:
+    Processor().interpret_tree(syntax_tree)
+
+
+def deep_copy_loop_iteration(loop: Token) -> None:
+    """
+        Perform the copies the previous Processor made for a single loop iteration:
+        the condition, then every statement of the body.
+    """
+    body = loop.children[0]
+    condition = loop.children[1]
+    copy.deepcopy(condition)
+    for statement in body.children:
+        copy.deepcopy(statement)
+
+
+def main() -> None:
+    iterations = int(argv[1]) if len(argv) > 1 else 10000
+
+    # Subtract a short run to cancel out the setup statements and the final condition check
+    short_run = count_allocations(lambda: run(parse(1)))
+    full_tree = parse(iterations + 1)
+    full_run = count_allocations(lambda: run(full_tree))
+    per_iteration = (full_run - short_run) / iterations
+
+    loop = next(statement for statement in full_tree.statements if statement.type == TokenType.WHILE)
+    copies_per_iteration = count_allocations(lambda: deep_copy_loop_iteration(loop))
+
+    start = time.perf_counter()
+    run(full_tree)
+    elapsed = time.perf_counter() - start
+
+    print(f'Counter loop, {iterations} iterations')
+    print(f'  objects allocated per iteration:        {per_iteration:.1f}')
+    print(f'  objects allocated by the removed copies: {copies_per_iteration}')
+    print(f'  time per iteration:                     {elapsed / (iterations + 1) * 1e6:.2f} us')
+
+
+if __name__ == '__main__':
+    main()
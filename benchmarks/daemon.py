@@ -0,0 +1,86 @@
+"""
+    Compare the time of running a short program with a new interpreter process every time,
+    with the time of submitting it to a running server, through the client and directly over the socket.
+
+    Usage: python3 -m benchmarks.daemon [runs] [workers]
+"""
+
+import pathlib
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from sys import argv
+from typing import Callable
+
+import src.protocol as protocol
+
+
+SHORT_PROGRAM_SOURCE = """
+;0 = i
+{
+    ;i ++
+} i 100 < while
+;(i) println
+"""
+
+
+def measure(runs: int, run: Callable[[], None]) -> float:
+    """
+        Return the mean time of a run, in seconds.
+    """
+    start = time.perf_counter()
+    for _ in range(runs):
+        run()
+    return (time.perf_counter() - start) / runs
+
+
+def submit(socket_path: pathlib.Path, source: str) -> None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(str(socket_path))
+        protocol.send_request(connection, {'source': source})
+        for kind, _ in protocol.read_frames(connection.makefile('rb')):
+            if kind == protocol.EXIT_FRAME:
+                return
+
+
+def wait_for_server(socket_path: pathlib.Path) -> None:
+    for _ in range(100):
+        try:
+            submit(socket_path, '')
+            return
+        except OSError:
+            time.sleep(0.1)
+    print('The server did not start.')
+    exit(1)
+
+
+def main() -> None:
+    runs = int(argv[1]) if len(argv) > 1 else 50
+    workers = argv[2] if len(argv) > 2 else '2'
+
+    with tempfile.TemporaryDirectory() as directory:
+        program_path = pathlib.Path(directory) / 'short.rev'
+        program_path.write_text(SHORT_PROGRAM_SOURCE)
+        socket_path = pathlib.Path(directory) / 'server.sock'
+
+        server = subprocess.Popen([sys.executable, '-m', 'src.server', str(socket_path), '--workers', workers], stderr=subprocess.DEVNULL)
+        try:
+            wait_for_server(socket_path)
+
+            print(f'Mean time of {runs} runs of a short program')
+            cold_time = measure(runs, lambda: subprocess.run([sys.executable, '-m', 'src', str(program_path)], stdout=subprocess.DEVNULL, check=True))
+            print(f'  {"new interpreter process:":<28} {cold_time * 1000:8.1f} ms')
+            client_time = measure(runs, lambda: subprocess.run([sys.executable, '-m', 'src.client', str(socket_path), str(program_path)], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, check=True))
+            print(f'  {"client and server:":<28} {client_time * 1000:8.1f} ms')
+            socket_time = measure(runs, lambda: submit(socket_path, SHORT_PROGRAM_SOURCE))
+            print(f'  {"server socket:":<28} {socket_time * 1000:8.1f} ms')
+
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
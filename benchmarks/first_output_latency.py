@@ -0,0 +1,51 @@
+"""
+    Measure the time from the start of the interpreter to the first line of output of a long program,
+    parsing the whole program first and in pipelined mode.
+
+    Usage: python3 -m benchmarks.first_output_latency [lines]
+"""
+
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+from sys import argv
+from typing import List, Tuple
+
+
+def generate_source(lines: int) -> str:
+    statements = ['; ("started") println']
+    for line in range(lines):
+        statements.append(f';{line} 60 * 24 * = seconds')
+    statements.append('; ("done") println')
+    return '\n'.join(statements)
+
+
+def measure(path: pathlib.Path, options: List[str]) -> Tuple[float, float]:
+    """
+        Return the time to the first line of output and the total time of running the program.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-m', 'src', str(path), *options], stdout=subprocess.PIPE, text=True)
+    process.stdout.readline()
+    first_output_time = time.perf_counter() - start
+    process.communicate()
+    return first_output_time, time.perf_counter() - start
+
+
+def main() -> None:
+    lines = int(argv[1]) if len(argv) > 1 else 20000
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory) / 'long.rev'
+        path.write_text(generate_source(lines))
+
+        print(f'Program of {lines} statements')
+        for name, options in (('whole program', []), ('pipelined', ['--pipeline'])):
+            first_output_time, total_time = measure(path, options)
+            print(f'  {name + ":":<24} first output after {first_output_time * 1000:.0f} ms, finished after {total_time * 1000:.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
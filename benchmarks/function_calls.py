@@ -0,0 +1,55 @@
+"""
+    Time a loop calling a small user function a million times, on both engines.
+
+    Usage: python3 -m benchmarks.function_calls [calls]
+"""
+
+import time
+from sys import argv
+
+from src.compiler import compile_tree
+from src.resolver import resolve_tree
+from src.syntax_tree import SyntaxTree
+from src.tokenizer import tokenize_source_code
+from src.vm import Processor
+
+
+CALL_LOOP_SOURCE = """
+{
+    ;return number 1 +
+} (number) increment
+;0 = i
+{
+    ;(i)increment = i
+} i {calls} < while
+"""
+
+
+def run(calls: int, use_bytecode: bool) -> float:
+    syntax_tree = SyntaxTree()
+    syntax_tree.parse_tokens(tokenize_source_code(CALL_LOOP_SOURCE.replace('{calls}', str(calls))))
+    resolve_tree(syntax_tree)
+    processor = Processor()
+
+    if use_bytecode:
+        code = compile_tree(syntax_tree)
+        start = time.perf_counter()
+        processor.execute_bytecode(code)
+    else:
+        start = time.perf_counter()
+        processor.interpret_tree(syntax_tree)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    calls = int(argv[1]) if len(argv) > 1 else 1000000
+
+    print(f'{calls} calls to a user function')
+    for use_bytecode in (False, True):
+        engine = 'bytecode' if use_bytecode else 'tree'
+        elapsed = run(calls, use_bytecode)
+        print(f'  {engine + ":":<10} {elapsed:.2f} s   {elapsed / calls * 1_000_000:.2f} us per call')
+
+
+if __name__ == '__main__':
+    main()
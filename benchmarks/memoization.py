@@ -0,0 +1,104 @@
+"""
+    Time a recursive fibonacci function with and without memoization of pure function calls, on both engines.
+    Then check that a memo shared by many programs, which declare functions of the same name, never returns the result of another program.
+
+    Usage: python3 -m benchmarks.memoization [n]
+"""
+
+import io
+import time
+from contextlib import redirect_stdout
+from sys import argv
+from typing import Union
+
+import src.output as output
+from src.api import run_source
+from src.compiler import compile_tree
+from src.memo import FunctionMemo
+from src.resolver import resolve_tree
+from src.syntax_tree import SyntaxTree
+from src.tokenizer import tokenize_source_code
+from src.vm import Processor
+
+
+FIBONACCI_SOURCE = """
+{
+    ;return number
+    {
+        ;(self, number 1 -)self (self, number 2 -)self + = number
+    } number 1 > if
+} (self, number) fib
+;(fib, {n})fib = result
+;(result)println
+"""
+
+# Function that differs in every program, called with the same argument
+SHARED_MEMO_SOURCE = """
+{
+    ;return x {i} +
+} (x) f
+;((1)f)println
+"""
+
+SHARED_MEMO_PROGRAMS = 300
+
+
+def run(n: int, use_bytecode: bool, memo: Union[FunctionMemo, None]) -> float:
+    syntax_tree = SyntaxTree()
+    syntax_tree.parse_tokens(tokenize_source_code(FIBONACCI_SOURCE.replace('{n}', str(n))))
+    resolve_tree(syntax_tree)
+    processor = Processor(memo)
+
+    with redirect_stdout(io.StringIO()):
+        if use_bytecode:
+            code = compile_tree(syntax_tree)
+            start = time.perf_counter()
+            processor.execute_bytecode(code)
+        else:
+            start = time.perf_counter()
+            processor.interpret_tree(syntax_tree)
+        output.flush()
+    return time.perf_counter() - start
+
+
+def count_stale_results(use_bytecode: bool) -> int:
+    """
+        Run many programs with the same memo and return the number of programs that printed a result memoized for another program.
+    """
+    memo = FunctionMemo()
+    stale_count = 0
+    for i in range(SHARED_MEMO_PROGRAMS):
+        stdout = io.StringIO()
+        run_source(SHARED_MEMO_SOURCE.replace('{i}', str(i)), io.StringIO(), stdout, use_bytecode, memo)
+        if stdout.getvalue() != f'{i + 1}\n':
+            stale_count += 1
+    return stale_count
+
+
+def main() -> None:
+    n = int(argv[1]) if len(argv) > 1 else 20
+
+    print(f'Recursive fibonacci of {n}')
+    for use_bytecode in (False, True):
+        engine = 'bytecode' if use_bytecode else 'tree'
+        plain_time = run(n, use_bytecode, None)
+        memo = FunctionMemo()
+        memoized_time = run(n, use_bytecode, memo)
+        print(f'  {engine}:')
+        print(f'    without memoization:   {plain_time * 1000:.1f} ms')
+        print(f'    with memoization:      {memoized_time * 1000:.1f} ms   ({memo.hits} hits, {memo.misses} misses)')
+
+    failed = False
+    print(f'Programs sharing a memo, out of {SHARED_MEMO_PROGRAMS}')
+    for use_bytecode in (False, True):
+        engine = 'bytecode' if use_bytecode else 'tree'
+        stale_count = count_stale_results(use_bytecode)
+        failed = failed or stale_count > 0
+        print(f'  {engine}: {stale_count} printed a stale result')
+
+    if failed:
+        exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+    Compare compact ARRAY values holding numbers with token list ARRAY values, used for arrays of mixed types:
+    memory per element, and time of concatenation, equality and printing.
+
+    Usage: python3 -m benchmarks.numeric_arrays [elements]
+"""
+
+import gc
+import io
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from sys import argv
+from typing import Callable, List
+
+import src.arrays as arrays
+import src.output as output
+from src.operations import add, equal, handle_print
+from src.token import Token, TokenType
+from src.utils import SourceCodeLocation
+
+
+LOCATION = SourceCodeLocation(0, 1)
+OPERATOR = Token(TokenType.PLUS, 0, LOCATION)
+
+
+def build_tokens(count: int) -> List[Token]:
+    return [Token(TokenType.NUMBER, 0, LOCATION, number) for number in range(count)]
+
+
+def build_mixed_tokens(count: int) -> List[Token]:
+    # A single string element is enough to keep the array from being packed
+    return [Token(TokenType.STRING, 0, LOCATION, 'first')] + build_tokens(count - 1)
+
+
+def measure_bytes(build: Callable[[], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    start_size, _ = tracemalloc.get_traced_memory()
+    value = build()
+    end_size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del value
+    return end_size - start_size
+
+
+def measure_time(function: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def report(name: str, count: int, make_value: Callable[[], arrays.ArrayValue]) -> None:
+    bytes_per_element = measure_bytes(make_value) / count
+    value = make_value()
+    other = make_value()
+    array_token = Token(TokenType.ARRAY, 0, LOCATION, value)
+
+    concatenation_time = measure_time(lambda: add(value, TokenType.ARRAY, other, TokenType.ARRAY, OPERATOR))
+    equality_time = measure_time(lambda: equal(value, TokenType.ARRAY, other, TokenType.ARRAY, OPERATOR))
+    with redirect_stdout(io.StringIO()):
+        print_time = measure_time(lambda: (handle_print([array_token], OPERATOR), output.flush()))
+
+    print(f'  {name}:')
+    print(f'    bytes per element:     {bytes_per_element:.1f}')
+    print(f'    concatenation:         {concatenation_time * 1000:.1f} ms')
+    print(f'    equality:              {equality_time * 1000:.1f} ms')
+    print(f'    print:                 {print_time * 1000:.1f} ms')
+
+
+def main() -> None:
+    count = int(argv[1]) if len(argv) > 1 else 200000
+
+    print(f'Arrays of {count} numbers')
+    report('compact array', count, lambda: arrays.pack(build_tokens(count)))
+    report('token list, mixed types', count, lambda: build_mixed_tokens(count))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+    Measure the time of a program printing many lines and arrays to a pipe, with several output buffer sizes.
+    A buffer size of 0 writes every printed value right away, the way the interpreter used to.
+
+    Usage: python3 -m benchmarks.output_throughput [lines]
+"""
+
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+from sys import argv
+
+
+BUFFER_SIZES = (0, 1024, 65536)
+
+PRINT_LOOP_SOURCE = """
+;0 = i
+;[1, "two", true, null] = row
+{
+    ;(i) println
+    ;(row) println
+    ;i ++
+} i {lines} < while
+"""
+
+
+def measure(path: pathlib.Path, buffer_size: int) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, '-m', 'src', str(path), '--no-cache', '--output-buffer', str(buffer_size)],
+        stdout=subprocess.PIPE,
+        check=True
+    )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    lines = int(argv[1]) if len(argv) > 1 else 100000
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory) / 'print.rev'
+        path.write_text(PRINT_LOOP_SOURCE.replace('{lines}', str(lines // 2)))
+
+        print(f'Program printing {lines} lines to a pipe')
+        for buffer_size in BUFFER_SIZES:
+            elapsed = measure(path, buffer_size)
+            print(f'  buffer of {buffer_size:>6} characters:   {elapsed:.2f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+    Time a loop whose condition guards a call to a costly user function with && and ||, on both engines.
+    The first operand decides the result in every iteration, so the function is never called.
+
+    Usage: python3 -m benchmarks.short_circuit [iterations]
+"""
+
+import time
+from sys import argv
+
+from src.compiler import compile_tree
+from src.resolver import resolve_tree
+from src.syntax_tree import SyntaxTree
+from src.tokenizer import tokenize_source_code
+from src.vm import Processor
+
+
+GUARDED_LOOP_SOURCE = """
+{
+    ;return true
+    ;0 = j
+    {
+        ;j ++
+    } j 100 < while
+} () costly
+;0 = i
+;false = skipped
+;true = taken
+{
+    ;i ++
+    ;skipped () costly && = a
+    ;taken () costly || = b
+} i {iterations} < while
+"""
+
+
+def run(iterations: int, use_bytecode: bool) -> float:
+    syntax_tree = SyntaxTree()
+    syntax_tree.parse_tokens(tokenize_source_code(GUARDED_LOOP_SOURCE.replace('{iterations}', str(iterations))))
+    resolve_tree(syntax_tree)
+    processor = Processor()
+
+    if use_bytecode:
+        code = compile_tree(syntax_tree)
+        start = time.perf_counter()
+        processor.execute_bytecode(code)
+    else:
+        start = time.perf_counter()
+        processor.interpret_tree(syntax_tree)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    iterations = int(argv[1]) if len(argv) > 1 else 20000
+
+    print(f'{iterations} iterations of a loop guarding a costly function with && and ||')
+    for use_bytecode in (False, True):
+        engine = 'bytecode' if use_bytecode else 'tree'
+        elapsed = run(iterations, use_bytecode)
+        print(f'  {engine + ":":<10} {elapsed:.3f} s   {elapsed / iterations * 1_000_000:.2f} us per iteration')
+
+
+if __name__ == '__main__':
+    main()
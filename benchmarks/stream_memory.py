@@ -0,0 +1,60 @@
+"""
+    Compare the peak memory of tokenizing a generated source file whole and streaming its tokens.
+    Streamed tokens are consumed one at a time, the way a statement by statement parser would consume them.
+
+    Usage: python3 -m benchmarks.stream_memory [lines]
+"""
+
+import gc
+import os
+import pathlib
+import tempfile
+import tracemalloc
+from sys import argv
+from typing import Callable
+
+from benchmarks.token_memory import generate_source
+from src.tokenizer import stream_tokens, tokenize_source_code
+from src.utils import load_file, open_file
+
+
+def tokenize_whole(path: pathlib.Path) -> int:
+    return len(tokenize_source_code(load_file(path)))
+
+
+def tokenize_streamed(path: pathlib.Path) -> int:
+    count = 0
+    with open_file(path) as file:
+        for _ in stream_tokens(file):
+            count += 1
+    return count
+
+
+def measure_peak(tokenize: Callable[[pathlib.Path], int], path: pathlib.Path) -> int:
+    gc.collect()
+    tracemalloc.start()
+    start_size, _ = tracemalloc.get_traced_memory()
+    tokenize(path)
+    _, peak_size = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak_size - start_size
+
+
+def main() -> None:
+    lines = int(argv[1]) if len(argv) > 1 else 20000
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory) / 'generated.rev'
+        path.write_text(generate_source(lines))
+        file_size = os.path.getsize(path)
+
+        whole_peak = measure_peak(tokenize_whole, path)
+        streamed_peak = measure_peak(tokenize_streamed, path)
+
+    print(f'Tokenized {lines} lines, {file_size / 1024:.0f} KiB')
+    print(f'  whole file peak memory:  {whole_peak / 1024:.0f} KiB ({whole_peak / file_size:.1f}x the file size)')
+    print(f'  streamed peak memory:    {streamed_peak / 1024:.0f} KiB ({streamed_peak / file_size:.1f}x the file size)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+    Time building large strings with += in a loop, and the first use of their contiguous text.
+    Without ropes every append copies the whole string, so the time grows quadratically with its length.
+
+    Usage: python3 -m benchmarks.string_appends [megabytes...]
+"""
+
+import time
+from sys import argv
+
+from src.resolver import resolve_tree
+from src.syntax_tree import SyntaxTree
+from src.tokenizer import tokenize_source_code
+from src.vm import Processor
+
+
+# Length of the string appended in every iteration
+CHUNK_LENGTH = 100
+
+APPEND_LOOP_SOURCE = """
+;"" = text
+;0 = i
+{
+    ;"{chunk}" += text
+    ;i ++
+} i {appends} < while
+;text "" == = empty
+"""
+
+
+def run(megabytes: int) -> float:
+    appends = megabytes * 1_000_000 // CHUNK_LENGTH
+    source = APPEND_LOOP_SOURCE.replace('{chunk}', 'x' * CHUNK_LENGTH).replace('{appends}', str(appends))
+
+    syntax_tree = SyntaxTree()
+    syntax_tree.parse_tokens(tokenize_source_code(source))
+    resolve_tree(syntax_tree)
+    processor = Processor()
+
+    start = time.perf_counter()
+    processor.interpret_tree(syntax_tree)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    sizes = [int(size) for size in argv[1:]] or [1, 5, 10]
+
+    print(f'Building strings with += of {CHUNK_LENGTH} characters at a time')
+    for megabytes in sizes:
+        elapsed = run(megabytes)
+        print(f'  {megabytes:>4} MB   {elapsed:.2f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""
+    Run the Reverse Language programs in benchmarks/programs and time the tokenizer, the parser and the processor separately.
+    Every program is run several times, and the mean and percentiles of each phase are reported.
+    The results can be saved as JSON and compared with the results of a previous run, saved as a baseline.
+
+    Usage: python3 -m benchmarks.suite [programs...] [options]
+
+    Options:
+        --repeat <count>         Number of runs of each program, 5 by default
+        --bytecode               Compile the programs and run them on the bytecode dispatch loop, instead of walking the tree
+        --output <file>          Save the results as JSON
+        --baseline <file>        Compare the results with the ones saved in the given file
+        --threshold <percent>    Mean slowdown of a phase, compared with the baseline, reported as a regression, 10 by default
+
+    Programs are selected by name, without the .rev extension. All the programs are run if none is given.
+    The exit code is 1 if a regression is found.
+"""
+
+import io
+import json
+import pathlib
+import platform
+import time
+from contextlib import redirect_stdout
+from sys import argv
+from typing import Dict, List, Union
+
+import src.output as output
+from src.compiler import compile_tree
+from src.optimizer import optimize_tree
+from src.resolver import resolve_tree
+from src.state import State
+from src.syntax_tree import SyntaxTree
+from src.tokenizer import tokenize_source_code
+from src.utils import load_file
+from src.vm import Processor
+
+
+PROGRAMS_DIRECTORY = pathlib.Path(__file__).parent / 'programs'
+
+# Results file format, to be increased whenever the layout of the results changes
+RESULTS_FORMAT = 1
+
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 10.0
+
+# Slowdowns shorter than this, in seconds, are measurement noise and are never reported as regressions
+MIN_REGRESSION_TIME = 0.001
+
+# Options that are followed by a value
+VALUE_OPTIONS = ('--repeat', '--output', '--baseline', '--threshold')
+
+
+# Samples, in seconds, of every phase of a program
+PhaseSamples = Dict[str, List[float]]
+
+# Statistics, in seconds, of every phase of every program
+Results = Dict[str, Dict[str, Dict[str, float]]]
+
+
+def get_option(name: str) -> Union[str, None]:
+    """
+        Return the value that follows the given option in the command line, or None if the option is not given.
+    """
+    if name not in argv:
+        return None
+    index = argv.index(name)
+    if index + 1 >= len(argv):
+        print(f'Missing value for option {name}.')
+        exit(1)
+    return argv[index + 1]
+
+
+def get_program_names() -> List[str]:
+    """
+        Return the names of the programs given in the command line, skipping the options and their values.
+    """
+    names: List[str] = []
+    arguments = iter(argv[1:])
+    for argument in arguments:
+        if argument in VALUE_OPTIONS:
+            next(arguments, None)
+        elif not argument.startswith('-'):
+            names.append(argument)
+    return names
+
+
+def percentile(samples: List[float], percent: float) -> float:
+    """
+        Return the given percentile of the samples, interpolating between the closest ranks.
+    """
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        'mean': sum(samples) / len(samples),
+        'min': min(samples),
+        'p50': percentile(samples, 50),
+        'p90': percentile(samples, 90),
+        'p99': percentile(samples, 99),
+        'max': max(samples),
+    }
+
+
+def run_program(path: pathlib.Path, use_bytecode: bool, samples: PhaseSamples) -> None:
+    """
+        Run the program once, adding the time of each phase to the samples.
+        The output of the program is discarded.
+    """
+    State.source_file = path
+    State.source_code = None
+    source = load_file(path)
+
+    start = time.perf_counter()
+    tokens = tokenize_source_code(source)
+    samples['tokenize'].append(time.perf_counter() - start)
+
+    # The parsing phase includes the passes that prepare the tree for execution
+    start = time.perf_counter()
+    syntax_tree = SyntaxTree()
+    syntax_tree.parse_tokens(tokens)
+    optimize_tree(syntax_tree)
+    resolve_tree(syntax_tree)
+    samples['parse'].append(time.perf_counter() - start)
+
+    if use_bytecode:
+        start = time.perf_counter()
+        code = compile_tree(syntax_tree)
+        samples['compile'].append(time.perf_counter() - start)
+
+    processor = Processor()
+    with redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        if use_bytecode:
+            processor.execute_bytecode(code)
+        else:
+            processor.interpret_tree(syntax_tree)
+        output.flush()
+        samples['execute'].append(time.perf_counter() - start)
+
+
+def benchmark_program(path: pathlib.Path, repeat: int, use_bytecode: bool) -> Dict[str, Dict[str, float]]:
+    phases = ['tokenize', 'parse', 'compile', 'execute'] if use_bytecode else ['tokenize', 'parse', 'execute']
+    samples: PhaseSamples = {phase: [] for phase in phases}
+
+    for _ in range(repeat):
+        run_program(path, use_bytecode, samples)
+
+    samples['total'] = [sum(run_samples) for run_samples in zip(*(samples[phase] for phase in phases))]
+    return {phase: summarize(phase_samples) for phase, phase_samples in samples.items()}
+
+
+def print_results(results: Results) -> None:
+    print(f'{"program":<24} {"phase":<10} {"mean":>10} {"min":>10} {"p50":>10} {"p90":>10} {"p99":>10} {"max":>10}   (ms)')
+    for name, phases in results.items():
+        for phase, statistics in phases.items():
+            values = ' '.join(f'{statistics[key] * 1000:10.2f}' for key in ('mean', 'min', 'p50', 'p90', 'p99', 'max'))
+            print(f'{name:<24} {phase:<10} {values}')
+            name = ''
+
+
+def compare_results(results: Results, baseline: Results, threshold: float) -> bool:
+    """
+        Print the change of the mean time of every phase, compared with the baseline.
+        Return whether any phase is slower than the baseline by more than the threshold, in percent.
+    """
+    found_regression = False
+
+    print(f'\n{"program":<24} {"phase":<10} {"baseline":>10} {"current":>10} {"change":>9}   (ms)')
+    for name, phases in results.items():
+        baseline_phases = baseline.get(name)
+        if baseline_phases is None:
+            print(f'{name:<24} not in the baseline')
+            continue
+
+        for phase, statistics in phases.items():
+            baseline_statistics = baseline_phases.get(phase)
+            if baseline_statistics is None:
+                continue
+
+            baseline_mean = baseline_statistics['mean']
+            mean = statistics['mean']
+            change = (mean - baseline_mean) / baseline_mean * 100 if baseline_mean > 0 else 0.0
+            marker = ''
+            if change > threshold and mean - baseline_mean > MIN_REGRESSION_TIME:
+                marker = '  REGRESSION'
+                found_regression = True
+
+            print(f'{name:<24} {phase:<10} {baseline_mean * 1000:10.2f} {mean * 1000:10.2f} {change:+8.1f}%{marker}')
+            name = ''
+
+    return found_regression
+
+
+def main() -> None:
+    repeat = int(get_option('--repeat') or DEFAULT_REPEAT)
+    threshold = float(get_option('--threshold') or DEFAULT_THRESHOLD)
+    output_path = get_option('--output')
+    baseline_path = get_option('--baseline')
+    use_bytecode = '--bytecode' in argv
+
+    if repeat < 1:
+        print('The number of runs must be at least 1.')
+        exit(1)
+
+    paths = sorted(PROGRAMS_DIRECTORY.glob('*.rev'))
+    names = get_program_names()
+    if len(names) != 0:
+        known_names = {path.stem for path in paths}
+        for name in names:
+            if name not in known_names:
+                print(f'Unknown benchmark program "{name}". Available programs: {", ".join(sorted(known_names))}')
+                exit(1)
+        paths = [path for path in paths if path.stem in names]
+
+    engine = 'bytecode' if use_bytecode else 'tree'
+    print(f'Running {len(paths)} programs {repeat} times each, on the {engine} engine\n')
+
+    results: Results = {}
+    for path in paths:
+        results[path.stem] = benchmark_program(path, repeat, use_bytecode)
+
+    print_results(results)
+
+    if output_path is not None:
+        report = {
+            'format': RESULTS_FORMAT,
+            'engine': engine,
+            'repeat': repeat,
+            'python': platform.python_version(),
+            'programs': results,
+        }
+        with open(output_path, 'w') as file:
+            json.dump(report, file, indent=4)
+        print(f'\nResults saved to {output_path}')
+
+    if baseline_path is not None:
+        with open(baseline_path) as file:
+            baseline_report = json.load(file)
+
+        if baseline_report.get('engine') != engine:
+            print(f'\nWarning: the baseline was measured on the {baseline_report.get("engine")} engine')
+
+        if compare_results(results, baseline_report['programs'], threshold):
+            exit(1)
+
+
+if __name__ == '__main__':
+    main()
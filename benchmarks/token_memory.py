@@ -0,0 +1,48 @@
+"""
+    Measure the memory taken by the tokens of a generated program, in bytes per token.
+
+    Usage: python3 -m benchmarks.token_memory [lines]
+"""
+
+import gc
+import tracemalloc
+from sys import argv
+
+from src.tokenizer import tokenize_source_code
+
+
+def generate_source(lines: int) -> str:
+    statements = []
+    for line in range(lines):
+        match line % 4:
+            case 0:
+                statements.append(f';{line} 60 * 24 * = seconds')
+            case 1:
+                statements.append(f';[{line}, "item", true, null] = items')
+            case 2:
+                statements.append(f';(items, seconds)process = result')
+            case 3:
+                statements.append(f'\\\\ comment {line}')
+    return '\n'.join(statements)
+
+
+def main() -> None:
+    lines = int(argv[1]) if len(argv) > 1 else 20000
+    source_code = generate_source(lines)
+
+    gc.collect()
+    tracemalloc.start()
+    start_size, _ = tracemalloc.get_traced_memory()
+    tokens = tokenize_source_code(source_code)
+    gc.collect()
+    end_size, peak_size = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    token_count = len(tokens)
+    print(f'Tokenized {lines} lines into {token_count} tokens')
+    print(f'  bytes per token:         {(end_size - start_size) / token_count:.1f}')
+    print(f'  peak bytes per token:    {(peak_size - start_size) / token_count:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+    Compare the speed of the lexeme-at-a-time tokenizer with the character by character reference tokenizer,
+    checking that both produce the same tokens.
+
+    Usage: python3 -m benchmarks.tokenizer_speed [lines]
+"""
+
+import time
+from sys import argv
+from typing import Callable, List, Tuple
+
+from benchmarks.token_memory import generate_source
+from src.token import Token
+from src.tokenizer import reference_tokenize_source_code, tokenize_source_code
+
+
+def describe(tokens: List[Token]) -> List[Tuple]:
+    return [
+        (token.type, token.priority, token.value, token.source_location.line_start, token.source_location.line_number)
+        for token in tokens
+    ]
+
+
+def measure(tokenizer: Callable[[str], List[Token]], source_code: str) -> Tuple[List[Token], float]:
+    start = time.perf_counter()
+    tokens = tokenizer(source_code)
+    return tokens, time.perf_counter() - start
+
+
+def main() -> None:
+    lines = int(argv[1]) if len(argv) > 1 else 20000
+    source_code = generate_source(lines)
+
+    reference_tokens, reference_time = measure(reference_tokenize_source_code, source_code)
+    tokens, time_taken = measure(tokenize_source_code, source_code)
+
+    if describe(tokens) != describe(reference_tokens):
+        print('The tokenizers produced different tokens')
+        exit(1)
+
+    print(f'Tokenized {lines} lines into {len(tokens)} tokens')
+    print(f'  reference tokenizer:     {reference_time * 1000:.1f} ms')
+    print(f'  lexeme tokenizer:        {time_taken * 1000:.1f} ms')
+    print(f'  speedup:                 {reference_time / time_taken:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+    Interface to run Reverse Language programs from Python code, without starting a new interpreter process for each program.
+
+    Errors of the programs are raised as subclasses of errors.ReverseError, which carry the SourceCodeLocation of the error,
+    instead of being printed. The global State of the command line interface is neither read nor modified,
+    so that a process can run any number of programs one after the other.
+    Programs can also run at the same time in different threads, since every thread has its own output buffer,
+    as long as they do not share a FunctionMemo.
+"""
+
+from typing import TextIO, Union
+
+import src.errors as errors
+import src.output as output
+from src.compiler import compile_tree
+from src.memo import FunctionMemo
+from src.optimizer import optimize_tree
+from src.resolver import resolve_tree
+from src.syntax_tree import SyntaxTree
+from src.tokenizer import tokenize_source_code
+from src.vm import Processor
+
+
+def run_source(
+        source: str,
+        stdin: Union[TextIO, None] = None,
+        stdout: Union[TextIO, None] = None,
+        use_bytecode: bool = False,
+        memo: Union[FunctionMemo, None] = None,
+        output_buffer_size: int = output.DEFAULT_BUFFER_SIZE
+    ) -> int:
+    """
+        Run the program whose source code is given and return its exit code: 0, or the code the program passed to exit.
+        The program reads its input from stdin and prints its output to stdout, the ones of the process by default.
+        The output printed before an error is written to stdout before the error is raised.
+        Programs that nest function calls or expressions too deeply raise errors.RecursionDepthError.
+    """
+    previous_buffer = output.set_buffer(output.OutputBuffer(output_buffer_size, False, stdout, stdin))
+
+    try:
+        syntax_tree = SyntaxTree()
+        syntax_tree.parse_tokens(tokenize_source_code(source))
+        optimize_tree(syntax_tree)
+        resolve_tree(syntax_tree)
+
+        processor = Processor(memo)
+        if use_bytecode:
+            processor.execute_bytecode(compile_tree(syntax_tree))
+        else:
+            processor.interpret_tree(syntax_tree)
+        return 0
+
+    except SystemExit as exit_request:
+        # Raised by the exit built-in function
+        return exit_request.code
+
+    except RecursionError:
+        # Nesting that the tree walker does not locate, like deeply nested expressions
+        raise errors.RecursionDepthError('Maximum recursion depth exceeded', None) from None
+
+    finally:
+        output.set_buffer(previous_buffer).flush()
@@ -0,0 +1,176 @@
+from array import array
+from typing import Any, List, Tuple, Union
+
+from src.token import Token, TokenType
+from src.utils import SourceCodeLocation
+
+
+# Typecodes of the compact arrays, by the Python type of the values of their NUMBER elements.
+# Integers and floats are kept apart so that elements keep their type, and thus their string representation.
+INTEGER_TYPECODE = 'q'
+FLOAT_TYPECODE = 'd'
+
+# Arrays shorter than this are kept as token lists, since packing them would cost more than it saves
+MIN_COMPACT_LENGTH = 16
+
+
+# ARRAY values are either lists of element tokens, or compact arrays holding the values of NUMBER elements
+ArrayValue = Union[List[Token], array]
+
+# Number of elements of flat arrays compared at once by are_equal
+EQUALITY_BLOCK_SIZE = 1024
+
+# Types of the elements whose values can be compared directly with ==, as long as both elements have the same type
+DIRECTLY_COMPARABLE_TYPES = frozenset((TokenType.NUMBER, TokenType.STRING, TokenType.BOOLEAN))
+
+
+def is_compact(value: ArrayValue) -> bool:
+    return isinstance(value, array)
+
+
+def get_number_typecode(value: Any) -> Union[str, None]:
+    """
+        Return the typecode of the compact array that can hold the given NUMBER value, or None if there is none.
+    """
+    value_type = type(value)
+    if value_type is int:
+        return INTEGER_TYPECODE
+    if value_type is float:
+        return FLOAT_TYPECODE
+    return None
+
+
+def pack(elements: List[Token], min_length: int = MIN_COMPACT_LENGTH) -> ArrayValue:
+    """
+        Return a compact array of the values of the elements if they are all NUMBER tokens of the same Python type,
+        or the element list itself otherwise.
+    """
+    if len(elements) < min_length:
+        return elements
+
+    first = elements[0]
+    if first.type != TokenType.NUMBER:
+        return elements
+    typecode = get_number_typecode(first.value)
+    if typecode is None:
+        return elements
+
+    value_type = type(first.value)
+    for element in elements:
+        if element.type != TokenType.NUMBER or type(element.value) is not value_type:
+            return elements
+
+    try:
+        return array(typecode, [element.value for element in elements])
+    except OverflowError:
+        # Integers that do not fit in 64 bits
+        return elements
+
+
+def unpack(value: ArrayValue, source_location: SourceCodeLocation) -> List[Token]:
+    """
+        Return the elements of the array as a list of tokens.
+    """
+    if not is_compact(value):
+        return value
+    return [Token(TokenType.NUMBER, 0, source_location, element) for element in value]
+
+
+def get_element(value: ArrayValue, index: int, source_location: SourceCodeLocation) -> Token:
+    """
+        Return the element at the given, valid, index as a token.
+    """
+    if is_compact(value):
+        return Token(TokenType.NUMBER, 0, source_location, value[index])
+    return value[index]
+
+
+def concatenate(value1: ArrayValue, value2: ArrayValue, source_location: SourceCodeLocation) -> ArrayValue:
+    """
+        Return the concatenation of the two arrays, compact if both can be packed with the same typecode.
+    """
+    compact1 = is_compact(value1)
+    compact2 = is_compact(value2)
+
+    if compact1 or compact2 or len(value1) + len(value2) >= MIN_COMPACT_LENGTH:
+        # Pack the token lists regardless of their length, the result is long enough to be compact
+        packed1 = value1 if compact1 else pack(value1, 1)
+        packed2 = value2 if compact2 else pack(value2, 1)
+        if is_compact(packed1) and is_compact(packed2) and packed1.typecode == packed2.typecode:
+            return packed1 + packed2
+        if len(value1) == 0:
+            return value2
+        if len(value2) == 0:
+            return value1
+
+    return unpack(value1, source_location) + unpack(value2, source_location)
+
+
+def are_equal(value1: ArrayValue, value2: ArrayValue) -> bool:
+    """
+        Return whether the two arrays have the same length and equal elements.
+        Elements are equal if they have the same type and equal values, arrays being compared element by element.
+        Elements of other types, like null, are never equal,
+        but an array is always equal to itself, the way Python containers are.
+
+        Nested arrays are compared iteratively, so that deep nesting does not exhaust the Python stack,
+        and flat arrays are compared in bulk, one block of elements at a time.
+    """
+    # Pairs of arrays still to be compared
+    pending: List[Tuple[ArrayValue, ArrayValue]] = [(value1, value2)]
+
+    while len(pending) > 0:
+        value1, value2 = pending.pop()
+
+        if value1 is value2:
+            continue
+        if len(value1) != len(value2):
+            return False
+
+        compact1 = is_compact(value1)
+        compact2 = is_compact(value2)
+
+        if compact1 and compact2:
+            if value1 != value2:
+                return False
+            continue
+
+        # Compare the arrays in blocks, so that arrays that differ early are not compared in full
+        for start in range(0, len(value1), EQUALITY_BLOCK_SIZE):
+            end = start + EQUALITY_BLOCK_SIZE
+            block1 = value1[start:end]
+            block2 = value2[start:end]
+
+            if compact1 or compact2:
+                numbers, elements = (block1, block2) if compact1 else (block2, block1)
+                for element in elements:
+                    if element.type != TokenType.NUMBER:
+                        return False
+                if numbers.tolist() != [element.value for element in elements]:
+                    return False
+                continue
+
+            element_types = [element.type for element in block1]
+            if element_types != [element.type for element in block2]:
+                return False
+
+            if DIRECTLY_COMPARABLE_TYPES.issuperset(element_types):
+                if [element.value for element in block1] != [element.value for element in block2]:
+                    return False
+                continue
+
+            for element1, element2 in zip(block1, block2):
+                if element1.type == TokenType.ARRAY:
+                    pending.append((element1.value, element2.value))
+                elif element1.type not in DIRECTLY_COMPARABLE_TYPES or element1.value != element2.value:
+                    return False
+
+    return True
+
+
+def to_string(value: array) -> str:
+    """
+        Return the string representation of a compact array, the same as the one of the equivalent token list.
+    """
+    return '[' + ', '.join(map(str, value)) + ']'
+
@@ -0,0 +1,341 @@
+"""
+    Run many Reverse Language programs in parallel, one per CPU core, and report how every program ended.
+
+    The programs are run by a pool of worker processes, which import the interpreter once and run one program after the other.
+    The output and the errors of every program are captured, and programs that run for longer than the timeout are stopped.
+
+    Usage: python3 -m src.batch <directories or glob patterns...> [options]
+
+    Options:
+        --jobs <count>          Number of programs run at the same time, one per CPU core by default
+        --timeout <seconds>     Time after which a program is stopped, 60 by default
+        --bytecode              Run the programs on the bytecode engine
+        --report <file>         Write the results, including the output of every program, as JSON to the given file
+
+    Directories are searched recursively for .rev files.
+    The exit code is 1 if any program failed, timed out or crashed its worker.
+"""
+
+import collections
+import concurrent.futures
+import glob
+import io
+import json
+import os
+import pathlib
+import signal
+import time
+from concurrent.futures.process import BrokenProcessPool
+from sys import argv
+from typing import Any, Dict, List, Set, Tuple, Union
+
+import src.errors as errors
+from src.api import run_source
+
+
+DEFAULT_TIMEOUT = 60.0
+
+# Programs submitted to the pool at a time for every worker, which keep the workers busy and are lost if a worker crashes
+QUEUED_PROGRAMS_PER_WORKER = 2
+
+# Options that are followed by a value
+VALUE_OPTIONS = ('--jobs', '--timeout', '--report')
+
+# Results format, to be increased whenever the layout of the JSON report changes
+REPORT_FORMAT = 1
+
+
+class ProgramTimeout(BaseException):
+    """
+        Raised in a worker when its program runs out of time.
+        It is not an Exception, so that nothing in the interpreter mistakes it for an error of the program.
+    """
+
+
+class ProgramResult:
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # One of 'ok', 'failed', 'error', 'timeout' and 'crashed'
+        self.status = 'crashed'
+        self.exit_code: Union[int, None] = None
+        # Seconds
+        self.runtime = 0.0
+        self.stdout = ''
+        self.stderr = ''
+
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'status': self.status,
+            'exit_code': self.exit_code,
+            'runtime': self.runtime,
+            'stdout': self.stdout,
+            'stderr': self.stderr,
+        }
+
+
+def raise_timeout(signal_number: int, frame: Any) -> None:
+    raise ProgramTimeout()
+
+
+def run_program(path: str, use_bytecode: bool, timeout: float) -> ProgramResult:
+    """
+        Run the program in the worker process, capturing its output, and return how it ended.
+        The program gets no input. Errors of the program are captured the way the command line interface prints them.
+    """
+    result = ProgramResult(path)
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+
+    try:
+        source = pathlib.Path(path).read_text()
+    except OSError as error:
+        result.status = 'error'
+        result.exit_code = 1
+        result.stderr = f'Could not read {path}: {error.strerror}\n'
+        return result
+
+    previous_handler = signal.signal(signal.SIGALRM, raise_timeout)
+    start = time.perf_counter()
+    try:
+        try:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+            exit_code = run_source(source, io.StringIO(), stdout, use_bytecode)
+        finally:
+            # Cancel the timer before anything else, so that it cannot fire while the end of the program is handled
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+        # Exit codes that are not integers are reported as a failure, like Python does
+        result.exit_code = exit_code if isinstance(exit_code, int) else 1
+        result.status = 'ok' if result.exit_code == 0 else 'failed'
+
+    except ProgramTimeout:
+        result.status = 'timeout'
+        stderr.write(f'Stopped after {timeout:g} seconds\n')
+
+    except errors.ReverseError as error:
+        result.status = 'error'
+        result.exit_code = 1
+        stderr.write('\n'.join([error.message, *errors.get_source_context(source, error.source_location)]) + '\n')
+
+    except Exception as error:
+        # Errors of the interpreter itself, reported in one line like the errors of the program
+        result.status = 'error'
+        result.exit_code = 1
+        stderr.write(f'Internal error of the interpreter: {type(error).__name__}: {error}\n')
+
+    finally:
+        signal.signal(signal.SIGALRM, previous_handler)
+        result.runtime = time.perf_counter() - start
+
+    result.stdout = stdout.getvalue()
+    result.stderr = stderr.getvalue()
+    return result
+
+
+def find_programs(patterns: List[str]) -> List[str]:
+    """
+        Return the .rev files in the given directories and the files matching the given glob patterns, without duplicates.
+    """
+    paths: List[str] = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(str(path) for path in sorted(pathlib.Path(pattern).rglob('*.rev')))
+        else:
+            paths.extend(sorted(glob.glob(pattern, recursive=True)))
+    return list(dict.fromkeys(paths))
+
+
+def print_progress(result: ProgramResult) -> None:
+    print(f'{result.status:<8} {result.runtime:8.3f} s   {result.path}', flush=True)
+
+
+def run_pool(paths: List[str], jobs: int, use_bytecode: bool, timeout: float, results: Dict[str, ProgramResult]) -> Tuple[List[str], List[str]]:
+    """
+        Run the programs on a new pool of worker processes, storing their results, until they all ran or a worker crashes.
+        Only a few programs per worker are submitted at a time, so that a crash only loses the programs the pool was running.
+        Return the programs that were lost with the crashed worker, and the programs that were not submitted.
+    """
+    pending = collections.deque(paths)
+    lost_paths: List[str] = []
+    is_broken = False
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        running: Dict[concurrent.futures.Future, str] = {}
+
+        while len(running) > 0 or (len(pending) > 0 and not is_broken):
+            # Programs are not submitted to a broken pool, and wait for the next one
+            while len(pending) > 0 and len(running) < jobs * QUEUED_PROGRAMS_PER_WORKER and not is_broken:
+                path = pending.popleft()
+                try:
+                    running[executor.submit(run_program, path, use_bytecode, timeout)] = path
+                except BrokenProcessPool:
+                    pending.appendleft(path)
+                    is_broken = True
+
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                path = running.pop(future)
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    lost_paths.append(path)
+                    is_broken = True
+                    continue
+                results[path] = result
+                print_progress(result)
+
+    return lost_paths, list(pending)
+
+
+def run_isolated(paths: List[str], use_bytecode: bool, timeout: float, results: Dict[str, ProgramResult]) -> None:
+    """
+        Run the programs one at a time on a worker of their own, storing their results,
+        so that a program that crashes its worker is the only program lost with it.
+        The worker is reused until a program crashes it.
+    """
+    executor: Union[concurrent.futures.ProcessPoolExecutor, None] = None
+    try:
+        for path in paths:
+            if executor is None:
+                executor = concurrent.futures.ProcessPoolExecutor(max_workers=1)
+            try:
+                result = executor.submit(run_program, path, use_bytecode, timeout).result()
+            except BrokenProcessPool:
+                result = ProgramResult(path)
+                result.stderr = 'The worker running the program crashed\n'
+                # A broken pool cannot run any other program
+                executor.shutdown()
+                executor = None
+            results[path] = result
+            print_progress(result)
+
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def run_batch(paths: List[str], jobs: int, use_bytecode: bool, timeout: float) -> List[ProgramResult]:
+    """
+        Run the programs on a pool of worker processes and return their results, in the order of the paths.
+        A worker that crashes brings the whole pool down, so the programs that were lost with it are run again
+        on a new pool, before the programs that were not submitted yet.
+        Programs lost in two crashes are run one at a time, to tell the program that crashed apart from the others.
+    """
+    results: Dict[str, ProgramResult] = {}
+    # Programs that were lost with a crashed worker once
+    suspect_paths: Set[str] = set()
+    isolated_paths: List[str] = []
+
+    pending_paths = paths
+    while len(pending_paths) > 0:
+        lost_paths, pending_paths = run_pool(pending_paths, jobs, use_bytecode, timeout, results)
+
+        retried_paths: List[str] = []
+        for path in lost_paths:
+            if path in suspect_paths:
+                isolated_paths.append(path)
+            else:
+                suspect_paths.add(path)
+                retried_paths.append(path)
+        pending_paths = retried_paths + pending_paths
+
+    run_isolated(isolated_paths, use_bytecode, timeout, results)
+
+    return [results[path] for path in paths]
+
+
+def print_summary(results: List[ProgramResult], wall_time: float, jobs: int) -> None:
+    statuses: Dict[str, int] = {}
+    for result in results:
+        statuses[result.status] = statuses.get(result.status, 0) + 1
+
+    total_runtime = sum(result.runtime for result in results)
+    print()
+    print(f'{len(results)} programs in {wall_time:.2f} s on {jobs} workers: {len(results) / wall_time:.1f} programs per second')
+    print(f'Total runtime of the programs {total_runtime:.2f} s, {total_runtime / wall_time:.1f} times the wall time')
+    print(', '.join(f'{count} {status}' for status, count in sorted(statuses.items())))
+
+    slowest = sorted(results, key=lambda result: result.runtime, reverse=True)[:5]
+    print('Slowest programs:')
+    for result in slowest:
+        print(f'  {result.runtime:8.3f} s   {result.path}')
+
+
+def write_report(results: List[ProgramResult], wall_time: float, jobs: int, path: str) -> None:
+    report = {
+        'format': REPORT_FORMAT,
+        'jobs': jobs,
+        'wall_time': wall_time,
+        'programs': [result.to_json() for result in results],
+    }
+    try:
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=4)
+    except OSError as error:
+        print(f'Could not write the report to "{path}": {error.strerror}')
+
+
+def get_option(name: str) -> Union[str, None]:
+    if name not in argv:
+        return None
+    index = argv.index(name)
+    if index + 1 >= len(argv):
+        print(f'Missing value for option {name}.')
+        exit(1)
+    return argv[index + 1]
+
+
+def get_patterns() -> List[str]:
+    """
+        Return the directories and glob patterns given in the command line, skipping the options and their values.
+    """
+    patterns: List[str] = []
+    arguments = iter(argv[1:])
+    for argument in arguments:
+        if argument in VALUE_OPTIONS:
+            next(arguments, None)
+        elif not argument.startswith('-'):
+            patterns.append(argument)
+    return patterns
+
+
+def main() -> None:
+    jobs_option = get_option('--jobs')
+    timeout_option = get_option('--timeout')
+    report_path = get_option('--report')
+
+    if jobs_option is not None and (not jobs_option.isdigit() or int(jobs_option) < 1):
+        print(f'Invalid number of jobs "{jobs_option}".')
+        exit(1)
+    jobs = (os.cpu_count() or 1) if jobs_option is None else int(jobs_option)
+
+    try:
+        timeout = DEFAULT_TIMEOUT if timeout_option is None else float(timeout_option)
+    except ValueError:
+        timeout = 0.0
+    if timeout <= 0:
+        print(f'Invalid timeout "{timeout_option}", expected a number of seconds.')
+        exit(1)
+
+    paths = find_programs(get_patterns())
+    if len(paths) == 0:
+        print('No programs found.')
+        exit(1)
+
+    start = time.perf_counter()
+    results = run_batch(paths, jobs, '--bytecode' in argv, timeout)
+    wall_time = time.perf_counter() - start
+
+    print_summary(results, wall_time, jobs)
+    if report_path is not None:
+        write_report(results, wall_time, jobs, report_path)
+
+    if any(result.status != 'ok' for result in results):
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import hashlib
+import os
+import pathlib
+import pickle
+from typing import Any, BinaryIO, Union
+
+
+# Marks the beginning of a cache file
+CACHE_MAGIC = b'REVC'
+
+# Format of the cache files, to be increased whenever the layout of the header changes
+CACHE_FORMAT = 1
+
+# Directory, next to the source file, that holds the cache files
+CACHE_DIRECTORY_NAME = '__revcache__'
+
+HASH_SIZE = hashlib.sha256().digest_size
+
+# Size of the chunks in which files are read to compute their hash
+HASH_CHUNK_SIZE = 1 << 16
+
+
+def hash_file(file: BinaryIO) -> bytes:
+    """
+        Return the sha256 digest of the rest of the file.
+    """
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    return digest.digest()
+
+
+def compute_interpreter_version() -> bytes:
+    """
+        Return a digest of the cache format and of the source code of the interpreter.
+        Any change to the interpreter invalidates the cached programs, since the cached objects depend on its classes.
+    """
+    digest = hashlib.sha256(CACHE_FORMAT.to_bytes(4, 'little'))
+    package_directory = pathlib.Path(__file__).parent
+    for module_path in sorted(package_directory.glob('*.py')):
+        digest.update(module_path.name.encode())
+        digest.update(module_path.read_bytes())
+    return digest.digest()
+
+
+class ProgramCache:
+    """
+        Cache of the programs compiled from a source file, stored in the __revcache__ directory next to it.
+        Each kind of compiled program, like a syntax tree or a code object, is stored in its own file.
+
+        File format:
+            magic | interpreter version | source hash | payload hash | payload
+        The payload is a pickle of the compiled program.
+        Files whose interpreter version or source hash do not match are stale,
+        files whose payload does not match its hash are corrupted. Both are ignored and overwritten.
+    """
+
+    def __init__(self, source_path: pathlib.Path) -> None:
+        self.source_path = source_path
+        self.directory = source_path.parent / CACHE_DIRECTORY_NAME
+
+        with open(source_path, 'rb') as file:
+            self.source_hash = hash_file(file)
+
+        self.interpreter_version = compute_interpreter_version()
+
+
+    def get_cache_path(self, kind: str) -> pathlib.Path:
+        return self.directory / f'{self.source_path.name}.{kind}.revc'
+
+
+    def load(self, kind: str) -> Union[Any, None]:
+        """
+            Return the cached program of the given kind, or None if there is no valid cached program.
+        """
+        try:
+            data = self.get_cache_path(kind).read_bytes()
+        except OSError:
+            return None
+
+        header_size = len(CACHE_MAGIC) + 3 * HASH_SIZE
+        if len(data) < header_size or not data.startswith(CACHE_MAGIC):
+            return None
+
+        index = len(CACHE_MAGIC)
+        interpreter_version = data[index:index + HASH_SIZE]
+        index += HASH_SIZE
+        source_hash = data[index:index + HASH_SIZE]
+        index += HASH_SIZE
+        payload_hash = data[index:index + HASH_SIZE]
+        payload = memoryview(data)[header_size:]
+
+        # The cached program was compiled from another version of the source code or by another interpreter
+        if interpreter_version != self.interpreter_version or source_hash != self.source_hash:
+            return None
+
+        # The cache file is corrupted
+        if hashlib.sha256(payload).digest() != payload_hash:
+            return None
+
+        try:
+            return pickle.loads(payload)
+        except Exception:
+            return None
+
+
+    def store(self, kind: str, program: Any) -> None:
+        """
+            Store the compiled program of the given kind.
+            Caching is best-effort: programs that cannot be serialized or written are not cached.
+        """
+        try:
+            payload = pickle.dumps(program, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, RecursionError):
+            return
+
+        header = CACHE_MAGIC + self.interpreter_version + self.source_hash + hashlib.sha256(payload).digest()
+
+        try:
+            self.directory.mkdir(exist_ok=True)
+            # Write to a temporary file first, so that concurrent runs never read a partially written cache file
+            cache_path = self.get_cache_path(kind)
+            temporary_path = cache_path.with_name(f'{cache_path.name}.{os.getpid()}.tmp')
+            try:
+                with open(temporary_path, 'wb') as file:
+                    file.write(header)
+                    file.write(payload)
+                os.replace(temporary_path, cache_path)
+            except BaseException:
+                temporary_path.unlink(missing_ok=True)
+                raise
+
+        except OSError:
+            return
+
@@ -0,0 +1,53 @@
+"""
+    Client that submits a Reverse Language program to a running server, and prints its output as the server streams it.
+    The exit code of the client is the exit code of the program.
+    The program gets no input, unless --stdin is given: then stdin is read to its end and submitted as the input of the program.
+
+    Usage: python3 -m src.client <socket> <source file> [--bytecode] [--stdin]
+
+    The server is started with: python3 -m src.server <socket>
+"""
+
+import pathlib
+import socket
+import sys
+from sys import argv
+
+import src.protocol as protocol
+from src.utils import load_file
+
+
+def main() -> None:
+    if len(argv) < 3:
+        print('Usage: python3 -m src.client <socket> <source file> [--bytecode] [--stdin]')
+        exit(1)
+
+    socket_path = argv[1]
+    request = {
+        'source': load_file(pathlib.Path(argv[2])),
+        'stdin': sys.stdin.read() if '--stdin' in argv else '',
+        'bytecode': '--bytecode' in argv,
+    }
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+    except OSError as error:
+        print(f'Could not connect to the server at "{socket_path}": {error.strerror}', file=sys.stderr)
+        exit(1)
+
+    with connection:
+        protocol.send_request(connection, request)
+        for kind, payload in protocol.read_frames(connection.makefile('rb')):
+            if kind == protocol.OUTPUT_FRAME:
+                sys.stdout.write(payload.decode())
+                sys.stdout.flush()
+            elif kind == protocol.EXIT_FRAME:
+                exit(int(payload))
+
+    print('The server closed the connection before the program ended.', file=sys.stderr)
+    exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+import enum
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+import src.errors as errors
+import src.operations as operations
+from src.symbols import ScopeLayout
+from src.syntax_tree import SyntaxTree
+from src.token import Token, TokenType, is_literal_type, operator_types
+
+
+@enum.unique
+class OpCode(enum.IntEnum):
+
+    def _generate_next_value_(name: str, start: int, count: int, last_values: List[int]) -> int:
+        return count
+
+    # Stack manipulation
+    PUSH_CONST = enum.auto()
+    POP_TOP = enum.auto()
+
+    # Symbols
+    LOAD_SLOT = enum.auto()
+    STORE_SLOT = enum.auto()
+
+    # Operators
+    BINARY_OP = enum.auto()
+    UNARY_OP = enum.auto()
+    INCREMENT_NAME = enum.auto()
+    AUGMENTED_ASSIGN = enum.auto()
+    BUILD_ARRAY = enum.auto()
+    INDEX_ARRAY = enum.auto()
+
+    # Control flow
+    JUMP = enum.auto()
+    POP_JUMP_IF_NOT_TRUE = enum.auto()
+    # Jumps of the logical operators, which keep the value of the first operand on the stack as the result
+    JUMP_IF_FALSE = enum.auto()
+    JUMP_IF_TRUE = enum.auto()
+
+    # Errors of operators left without operands by the parser, raised when the operator is executed
+    MISSING_OPERANDS = enum.auto()
+
+    # Functions
+    DECLARE_FUNCTION = enum.auto()
+    CALL_FUNCTION = enum.auto()
+    # Call whose result is returned right away, so that the callee can replace the frame of the caller
+    TAIL_CALL_FUNCTION = enum.auto()
+    RETURN_VALUE = enum.auto()
+
+
+"""
+    Table of binary operators
+    Format: operator type: (operation, result type)
+    A result type of None means that the result has the same type as the first operand.
+"""
+binary_operations_table: Dict[TokenType, Tuple[Callable, Union[TokenType, None]]] = \
+{
+    TokenType.PLUS: (operations.add, None),
+    TokenType.MINUS: (operations.subtract, TokenType.NUMBER),
+    TokenType.MULTIPLY: (operations.multiply, TokenType.NUMBER),
+    TokenType.DIVIDE: (operations.divide, TokenType.NUMBER),
+    TokenType.MODULO: (operations.modulo, TokenType.NUMBER),
+    TokenType.EQUAL: (operations.equal, TokenType.BOOLEAN),
+    TokenType.NOT_EQUAL: (operations.not_equal, TokenType.BOOLEAN),
+    TokenType.GREATER_THAN: (operations.greater_than, TokenType.BOOLEAN),
+    TokenType.LESS_THAN: (operations.less_than, TokenType.BOOLEAN),
+    TokenType.GREATER_THAN_OR_EQUAL: (operations.greater_than_or_equal, TokenType.BOOLEAN),
+    TokenType.LESS_THAN_OR_EQUAL: (operations.less_than_or_equal, TokenType.BOOLEAN),
+    TokenType.AND: (operations.and_, TokenType.BOOLEAN),
+    TokenType.OR: (operations.or_, TokenType.BOOLEAN),
+}
+
+
+"""
+    Table of assignment operators that update an existing symbol
+    Format: operator type: operation
+"""
+augmented_assignment_operations_table: Dict[TokenType, Callable] = \
+{
+    TokenType.ASSIGNMENT_ADD: operations.add,
+    TokenType.ASSIGNMENT_SUB: operations.subtract,
+    TokenType.ASSIGNMENT_MUL: operations.multiply,
+    TokenType.ASSIGNMENT_DIV: operations.divide,
+    TokenType.ASSIGNMENT_MOD: operations.modulo,
+}
+
+
+class CodeObject:
+    """
+        A flat instruction stream, made of an opcode array and a parallel operand array.
+        Jump operands are absolute instruction indices within the same code object.
+    """
+
+    def __init__(self, name: str, parameters: List[str], layout: ScopeLayout) -> None:
+        self.name = name
+        self.parameters = parameters
+        # Slots of the scope the code runs in
+        self.layout = layout
+        self.opcodes: List[OpCode] = []
+        self.operands: List[Any] = []
+
+
+    def emit(self, opcode: OpCode, operand: Any = None) -> int:
+        """
+            Append an instruction and return its index.
+        """
+        self.opcodes.append(opcode)
+        self.operands.append(operand)
+        return len(self.opcodes) - 1
+
+
+    def patch_jump(self, index: int, target: Union[int, None] = None) -> None:
+        """
+            Set the target of the jump at the given index, defaulting to the next instruction.
+        """
+        self.operands[index] = len(self.opcodes) if target is None else target
+
+
+    def disassemble(self) -> str:
+        string = f'<CodeObject {self.name} ({", ".join(self.parameters)})>\n'
+        nested: List[CodeObject] = []
+        for index, (opcode, operand) in enumerate(zip(self.opcodes, self.operands)):
+            string += f'{index:>6} {opcode.name:<22} {format_operand(opcode, operand)}\n'
+            if opcode == OpCode.DECLARE_FUNCTION:
+                nested.append(operand[1])
+        string += f'</CodeObject {self.name}>'
+        for code in nested:
+            string += '\n\n' + code.disassemble()
+        return string
+
+
+    def __str__(self) -> str:
+        return self.disassemble()
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+def format_operand(opcode: OpCode, operand: Any) -> str:
+    match opcode:
+        case OpCode.PUSH_CONST:
+            return str(operand.value)
+        case OpCode.LOAD_SLOT | OpCode.STORE_SLOT:
+            return f'{operand.slot} ({operand.value})'
+        case OpCode.BINARY_OP | OpCode.UNARY_OP:
+            return operand[-1].type.name
+        case OpCode.INCREMENT_NAME | OpCode.AUGMENTED_ASSIGN:
+            return f'{operand[2].type.name} {operand[1].slot} ({operand[1].value})'
+        case OpCode.BUILD_ARRAY:
+            return str(operand[0])
+        case OpCode.MISSING_OPERANDS:
+            return operand.type.name
+        case OpCode.DECLARE_FUNCTION:
+            return f'{operand[0].slot} ({operand[0].value})'
+        case OpCode.CALL_FUNCTION | OpCode.TAIL_CALL_FUNCTION:
+            return f'{operand[0].value} ({operand[1]})'
+        case OpCode.JUMP | OpCode.POP_JUMP_IF_NOT_TRUE | OpCode.JUMP_IF_FALSE | OpCode.JUMP_IF_TRUE:
+            return f'-> {operand}'
+    return ''
+
+
+class Loop:
+    """
+        Jump targets of the loop being compiled, used by break and continue statements.
+    """
+
+    def __init__(self, condition_index: int) -> None:
+        self.condition_index = condition_index
+        self.break_jumps: List[int] = []
+
+
+class Compiler:
+
+    def __init__(self, code: CodeObject) -> None:
+        self.code = code
+        self.loops: List[Loop] = []
+        # Jumps emitted by break and continue statements outside of any loop
+        self.exit_jumps: List[int] = []
+
+
+    def compile_statements(self, statements: List[Token]) -> None:
+        for statement in statements:
+            self.compile_statement(statement)
+
+
+    def compile_statement(self, root: Token) -> None:
+        """
+            Compile a statement, leaving the evaluation stack unchanged.
+        """
+        match root.type:
+
+            case TokenType.IF:
+                body = root.children[0]
+                condition = root.children[1]
+
+                self.compile_expression(condition)
+                jump_to_else = self.code.emit(OpCode.POP_JUMP_IF_NOT_TRUE)
+                self.compile_statements(body.children)
+
+                if len(root.children) == 3:
+                    else_statement = root.children[2]
+                    jump_to_end = self.code.emit(OpCode.JUMP)
+                    self.code.patch_jump(jump_to_else)
+                    self.compile_statements(else_statement.children[0].children)
+                    self.code.patch_jump(jump_to_end)
+                else:
+                    self.code.patch_jump(jump_to_else)
+
+
+            case TokenType.WHILE:
+                body = root.children[0]
+                condition = root.children[1]
+
+                loop = Loop(len(self.code.opcodes))
+                self.loops.append(loop)
+
+                self.compile_expression(condition)
+                jump_to_end = self.code.emit(OpCode.POP_JUMP_IF_NOT_TRUE)
+                self.compile_statements(body.children)
+                self.code.emit(OpCode.JUMP, loop.condition_index)
+
+                self.loops.pop()
+                self.code.patch_jump(jump_to_end)
+                for jump in loop.break_jumps:
+                    self.code.patch_jump(jump)
+
+
+            case TokenType.BREAK:
+                jump = self.code.emit(OpCode.JUMP)
+                if len(self.loops) > 0:
+                    self.loops[-1].break_jumps.append(jump)
+                else:
+                    # Outside of a loop, break stops the execution of the current code
+                    self.exit_jumps.append(jump)
+
+
+            case TokenType.CONTINUE:
+                if len(self.loops) > 0:
+                    self.code.emit(OpCode.JUMP, self.loops[-1].condition_index)
+                else:
+                    self.exit_jumps.append(self.code.emit(OpCode.JUMP))
+
+
+            case TokenType.CURLY_BRACKET:
+                # A bare block is executed in place
+                self.compile_statements(root.children)
+
+
+            case TokenType.FUNCTION_DECLARATION:
+                body_token: Token = root.value[0]
+                parameters_token_list: List[Token] = root.value[1]
+                identifier_token: Token = root.value[2]
+                layout: ScopeLayout = root.value[3]
+
+                function = compile_function(
+                    identifier_token.value,
+                    [parameter.value for parameter in parameters_token_list],
+                    body_token.children,
+                    layout
+                )
+                self.code.emit(OpCode.DECLARE_FUNCTION, (identifier_token, function))
+
+
+            case TokenType.IDENTIFIER:
+                # A bare identifier statement has no effect
+                pass
+
+
+            case _:
+                # Plain literals have no effect either, except arrays which check their elements
+                if root.type != TokenType.ARRAY and is_literal_type(root.type):
+                    return
+
+                self.compile_expression(root)
+                self.code.emit(OpCode.POP_TOP)
+
+
+    def compile_expression(self, root: Token) -> None:
+        """
+            Compile an expression, pushing exactly one value onto the evaluation stack.
+        """
+        if len(root.children) == 0 and root.type in operator_types:
+            # Like the tree walker, report the missing operands only if the expression is executed
+            self.code.emit(OpCode.MISSING_OPERANDS, root)
+            return
+
+        match root.type:
+
+            case TokenType.NUMBER | \
+                TokenType.STRING | \
+                TokenType.BOOLEAN | \
+                TokenType.NULL:
+                self.code.emit(OpCode.PUSH_CONST, root)
+
+
+            case TokenType.IDENTIFIER:
+                self.code.emit(OpCode.LOAD_SLOT, root)
+
+
+            case TokenType.PLUS | \
+                TokenType.MINUS | \
+                TokenType.MULTIPLY | \
+                TokenType.DIVIDE | \
+                TokenType.MODULO | \
+                TokenType.EQUAL | \
+                TokenType.NOT_EQUAL | \
+                TokenType.GREATER_THAN | \
+                TokenType.LESS_THAN | \
+                TokenType.GREATER_THAN_OR_EQUAL | \
+                TokenType.LESS_THAN_OR_EQUAL:
+
+                self.compile_expression(root.children[0])
+                self.compile_expression(root.children[1])
+                operation, result_type = binary_operations_table[root.type]
+                self.code.emit(OpCode.BINARY_OP, (operation, result_type, root))
+
+
+            case TokenType.AND | \
+                TokenType.OR:
+
+                # Skip the second operand if the first one decides the result.
+                # Otherwise both operands are type checked by the binary operation, as usual.
+                self.compile_expression(root.children[0])
+                jump_to_end = self.code.emit(OpCode.JUMP_IF_FALSE if root.type == TokenType.AND else OpCode.JUMP_IF_TRUE)
+                self.compile_expression(root.children[1])
+                operation, result_type = binary_operations_table[root.type]
+                self.code.emit(OpCode.BINARY_OP, (operation, result_type, root))
+                self.code.patch_jump(jump_to_end)
+
+
+            case TokenType.NOT:
+                self.compile_expression(root.children[0])
+                self.code.emit(OpCode.UNARY_OP, (operations.not_, TokenType.BOOLEAN, root))
+
+
+            case TokenType.INCREMENT:
+                self.code.emit(OpCode.INCREMENT_NAME, (operations.increment, root.children[0], root))
+
+            case TokenType.DECREMENT:
+                self.code.emit(OpCode.INCREMENT_NAME, (operations.decrement, root.children[0], root))
+
+
+            case TokenType.ASSIGNMENT:
+                self.compile_expression(root.children[0])
+                self.code.emit(OpCode.STORE_SLOT, root.children[1])
+
+
+            case TokenType.ASSIGNMENT_ADD | \
+                TokenType.ASSIGNMENT_SUB | \
+                TokenType.ASSIGNMENT_MUL | \
+                TokenType.ASSIGNMENT_DIV | \
+                TokenType.ASSIGNMENT_MOD:
+
+                self.compile_expression(root.children[0])
+                operation = augmented_assignment_operations_table[root.type]
+                self.code.emit(OpCode.AUGMENTED_ASSIGN, (operation, root.children[1], root))
+
+
+            case TokenType.PARENTHESIS:
+                # The value of a parenthesis is the value of its first child
+                self.compile_expression(root.children[0])
+                for child in root.children[1:]:
+                    self.compile_expression(child)
+                    self.code.emit(OpCode.POP_TOP)
+
+
+            case TokenType.ARRAY:
+                for element in root.children:
+                    self.compile_expression(element)
+                self.code.emit(OpCode.BUILD_ARRAY, (len(root.children), root))
+
+
+            case TokenType.ARRAY_INDEXING:
+                self.compile_expression(root.children[0])
+                self.compile_expression(root.children[1])
+                self.code.emit(OpCode.INDEX_ARRAY, root)
+
+
+            case TokenType.FUNCTION_CALL:
+                arguments_token_list: List[Token] = root.value[0]
+                identifier_token: Token = root.value[1]
+
+                for argument in arguments_token_list:
+                    self.compile_expression(argument)
+                self.code.emit(OpCode.CALL_FUNCTION, (identifier_token, len(arguments_token_list), root))
+
+
+            case TokenType.RETURN:
+                self.compile_expression(root.children[0])
+
+
+            case _:
+                # Like the tree walker, evaluate the operands of any other token and take the token itself as its value
+                for child in root.children:
+                    self.compile_expression(child)
+                    self.code.emit(OpCode.POP_TOP)
+                self.code.emit(OpCode.PUSH_CONST, root)
+
+
+def compile_function(name: str, parameters: List[str], statements: List[Token], layout: ScopeLayout) -> CodeObject:
+    """
+        Compile a function body. The return statement, which the parser guarantees
+        to be the first statement, is evaluated after the rest of the body.
+        A call that computes the return value is compiled as a tail call.
+    """
+    code = CodeObject(name, parameters, layout)
+    compiler = Compiler(code)
+
+    compiler.compile_statements(statements[1:])
+    for jump in compiler.exit_jumps:
+        code.patch_jump(jump)
+
+    compiler.compile_expression(statements[0])
+    if code.opcodes[-1] == OpCode.CALL_FUNCTION:
+        code.opcodes[-1] = OpCode.TAIL_CALL_FUNCTION
+    code.emit(OpCode.RETURN_VALUE)
+    return code
+
+
+def compile_tree(syntax_tree: SyntaxTree) -> CodeObject:
+    """
+        Lower the statements of the resolved syntax tree to a flat instruction stream.
+    """
+    code = CodeObject('<main>', [], syntax_tree.layout)
+    compiler = Compiler(code)
+
+    compiler.compile_statements(syntax_tree.statements)
+    for jump in compiler.exit_jumps:
+        code.patch_jump(jump)
+
+    return code
@@ -1,53 +1,124 @@
-from typing import Any, Tuple, Union
+from typing import Any, List, Tuple, Union
 
-from src.utils import SourceCodeLocation
-from src.token import TokenType
+import src.output as output
+from src.utils import SourceCodeLocation, load_file
+from src.token import TokenType, get_supported_operand_types
 from src.state import State
 
 
-def print_source_context(source_location: SourceCodeLocation) -> None:
+class ReverseError(Exception):
     """
-        Print the line of source code that the given source location is in,
-        along with the 4 preceding and 4 following lines of source code, if they exist.
+        Error of a Reverse Language program, found at the given location of its source code.
+        The command line interface prints the message and the source code around the location, and exits with code 1.
     """
+
+    def __init__(self, message: str, source_location: Union[SourceCodeLocation, None]) -> None:
+        super().__init__(message)
+        self.message = message
+        self.source_location = source_location
+
+
+class ReverseSyntaxError(ReverseError):
+    """
+        Raised while tokenizing or parsing source code that is not valid.
+    """
+
+
+class OperandTypeError(ReverseError):
+    """
+        Raised when an operator or a built-in function is given a value of a type it does not support.
+    """
+
+
+class UndefinedIdentifierError(ReverseError):
+    pass
+
+
+class DivisionByZeroError(ReverseError):
+    pass
+
+
+class ArgumentError(ReverseError):
+    """
+        Raised when a function is called with the wrong number of arguments, or with an argument value it cannot handle.
+    """
+
+
+class IndexOutOfBoundsError(ReverseError):
+    pass
+
+
+class InputError(ReverseError):
+    """
+        Raised when a program reads input after the end of its input.
+    """
+
+
+class RecursionDepthError(ReverseError):
+    """
+        Raised when a program nests function calls or expressions deeper than the stack of the interpreter allows.
+        The source location is None if the error cannot be located.
+    """
+
+
+def get_source_context(source_code: str, source_location: Union[SourceCodeLocation, None]) -> List[str]:
+    """
+        Return the line of source code that the given source location is in,
+        along with the 4 preceding and 4 following lines of source code, if they exist, prefixed by their line number.
+        Errors without a source location have no context.
+    """
+    if source_location is None:
+        return []
+
     # Get to the beginning of the line whose number is (source_location.line_number - 2)
     lines_to_go_back = 4
     index = source_location.line_start - 1
     while index > 0 and lines_to_go_back > 0:
         index -= 1
-        if State.source_code[index] == '\n':
+        if source_code[index] == '\n':
             lines_to_go_back -= 1
 
-    # Print up to 5 surrounding lines of source code, if they exist
-    lines = State.source_code[index + 1:].split('\n', maxsplit=8)[:8]
+    # Up to 5 surrounding lines of source code, if they exist
+    lines = source_code[index + 1:].split('\n', maxsplit=8)[:8]
     starting_line_number = source_location.line_number - (4 - lines_to_go_back)
-    for line in lines:
-        print(f'{starting_line_number}: {line}')
-        starting_line_number += 1
+    return [f'{starting_line_number + offset}: {line}' for offset, line in enumerate(lines)]
+
+
+def print_source_context(source_location: Union[SourceCodeLocation, None]) -> None:
+    if source_location is None:
+        return
+
+    if State.source_code is None:
+        # The source code is being streamed, load it whole to show the context of the error
+        State.source_code = load_file(State.source_file)
+
+    for line in get_source_context(State.source_code, source_location):
+        print(line)
+
+
+def print_error(error: ReverseError) -> None:
+    """
+        Print the error and the source code around it, after the output the program printed before the error.
+    """
+    output.flush()
+    print(error.message)
+    print_source_context(error.source_location)
 
 
 def unexpected_character(character: str, source_location: SourceCodeLocation) -> None:
-    print(f'Unexpected character "{character}" at line {source_location.line_number}')
-    print_source_context(source_location)    
-    exit(1)
+    raise ReverseSyntaxError(f'Unexpected character "{character}" at line {source_location.line_number}', source_location)
 
 
 def unbalanced_parentheses(source_location: SourceCodeLocation) -> None:
-    print(f'Unbalanced parenthesis at line {source_location.line_number}')
-    print_source_context(source_location)
-    exit(1)
+    raise ReverseSyntaxError(f'Unbalanced parenthesis at line {source_location.line_number}', source_location)
 
 
 def unbalanced_square_brackets(source_location: SourceCodeLocation) -> None:
-    print(f'Unbalanced square brackets at line {source_location.line_number}')
-    print_source_context(source_location)
-    exit(1)
+    raise ReverseSyntaxError(f'Unbalanced square brackets at line {source_location.line_number}', source_location)
 
 
 def unbalanced_curly_brackets(source_location: SourceCodeLocation) -> None:
-    print(f'Unbalanced curly brackets at line {source_location.line_number}')
-    print_source_context(source_location)
-    exit(1)
+    raise ReverseSyntaxError(f'Unbalanced curly brackets at line {source_location.line_number}', source_location)
 
 
 def type_error(expected_types: Tuple[TokenType], actual_type: Union[TokenType, Tuple[TokenType]], operator: TokenType, source_location: SourceCodeLocation) -> None:
@@ -57,63 +128,67 @@ def type_error(expected_types: Tuple[TokenType], actual_type: Union[TokenType, T
         actual_types_string = actual_type.name
 
     expected_types_string = ', '.join(map(lambda t: t.name, expected_types))
-    
-    print(f'Type error: operator {operator.name} at line {source_location.line_number} supports {expected_types_string}, but got {actual_types_string}')
-    print_source_context(source_location)
-    exit(1)
+
+    raise OperandTypeError(
+        f'Type error: operator {operator.name} at line {source_location.line_number} supports {expected_types_string}, but got {actual_types_string}',
+        source_location
+    )
 
 
 def undefined_identifier(identifier: str, source_location: SourceCodeLocation) -> None:
-    print(f'Undefined identifier "{identifier}" at line {source_location.line_number}')
-    print_source_context(source_location)
-    exit(1)
+    raise UndefinedIdentifierError(f'Undefined identifier "{identifier}" at line {source_location.line_number}', source_location)
 
 
 def division_by_zero(source_location: SourceCodeLocation) -> None:
-    print(f'Division by zero at line {source_location.line_number}')
-    print_source_context(source_location)
-    exit(1)
+    raise DivisionByZeroError(f'Division by zero at line {source_location.line_number}', source_location)
 
 
 def expected_operand(operator: TokenType, expected_types: Tuple[TokenType], source_location: SourceCodeLocation) -> None:
     expected_types_string = ', '.join(map(lambda t: t.name, expected_types))
-    print(f'Expected operand for operator {operator.name} at line {source_location.line_number} supports {expected_types_string}, but none was found')
-    print_source_context(source_location)
-    exit(1)
+    raise ReverseSyntaxError(
+        f'Expected operand for operator {operator.name} at line {source_location.line_number} supports {expected_types_string}, but none was found',
+        source_location
+    )
+
+
+def missing_operands(operator: TokenType, source_location: SourceCodeLocation) -> None:
+    # Parentheses take any value
+    expected_operand(operator, get_supported_operand_types(operator) or (TokenType.LITERAL,), source_location)
 
 
 def else_without_if(source_location: SourceCodeLocation) -> None:
-    print(f'Else without if at line {source_location.line_number}')
-    print_source_context(source_location)
-    exit(1)
+    raise ReverseSyntaxError(f'Else without if at line {source_location.line_number}', source_location)
 
 
 def wrong_argument_count(function_name: str, expected_count: int, actual_count: int, source_location: SourceCodeLocation) -> None:
-    print(f'Wrong argument count for function {function_name} at line {source_location.line_number}: expected {expected_count}, got {actual_count}')
-    print_source_context(source_location)
-    exit(1)
+    raise ArgumentError(
+        f'Wrong argument count for function {function_name} at line {source_location.line_number}: expected {expected_count}, got {actual_count}',
+        source_location
+    )
 
 
 def invalid_argument(function_name: str, argument_index: int, argument_value: Any, source_location: SourceCodeLocation) -> None:
-    print(f'Invalid argument {argument_index} for function {function_name} at line {source_location.line_number}: {argument_value}')
-    print_source_context(source_location)
-    exit(1)
+    raise ArgumentError(
+        f'Invalid argument {argument_index} for function {function_name} at line {source_location.line_number}: {argument_value}',
+        source_location
+    )
 
 
 def unsupported_token(token: TokenType, source_location: SourceCodeLocation) -> None:
-    print(f'Unsupported token {token.name} at line {source_location.line_number}')
-    print_source_context(source_location)
-    exit(1)
+    raise ReverseSyntaxError(f'Unsupported token {token.name} at line {source_location.line_number}', source_location)
 
 
 def missing_return_statement(function_name: str, source_location: SourceCodeLocation) -> None:
-    print(f'Missing return statement for function {function_name} at line {source_location.line_number}')
-    print_source_context(source_location)
-    exit(1)
+    raise ReverseSyntaxError(f'Missing return statement for function {function_name} at line {source_location.line_number}', source_location)
 
 
 def array_index_out_of_bounds(length: int, index: int, source_location: SourceCodeLocation) -> None:
-    print(f'Array index out of bounds: length {length}, index {index} at line {source_location.line_number}')
-    print_source_context(source_location)
-    exit(1)
+    raise IndexOutOfBoundsError(f'Array index out of bounds: length {length}, index {index} at line {source_location.line_number}', source_location)
+
+
+def recursion_too_deep(function_name: str, source_location: SourceCodeLocation) -> None:
+    raise RecursionDepthError(f'Maximum recursion depth exceeded calling function {function_name} at line {source_location.line_number}', source_location)
+
 
+def end_of_input(function_name: str, source_location: SourceCodeLocation) -> None:
+    raise InputError(f'End of input reached calling function {function_name} at line {source_location.line_number}', source_location)
@@ -1,45 +1,281 @@
 import pathlib
+import sys
 from sys import argv
+from typing import Iterable, TextIO, Union
 
-from src.utils import load_file
-from src.tokenizer import tokenize_source_code
-from src.syntax_tree import SyntaxTree
+from src.utils import load_file, open_file
+from src.tokenizer import stream_tokens, tokenize_source_code
+from src.syntax_tree import SyntaxTree, split_statements
+from src.symbols import ScopeLayout
+from src.token import Token
+from src.optimizer import optimize_tree
+from src.resolver import resolve_tree
+from src.compiler import CodeObject, compile_tree
+from src.cache import ProgramCache
 from src.vm import Processor
 from src.state import State
+from src.stats import RunStatistics, count_instructions, count_tree_nodes, write_report
+from src.profiler import Profile, ProfilingProcessor
+from src.memo import DEFAULT_MEMO_SIZE, FunctionMemo
+import src.output as output
+import src.errors as errors
 
 
-def main() -> None:
-
-    if len(argv) < 2:
-        print('No source code file specified.')
+def get_option_value(option: str) -> Union[str, None]:
+    """
+        Return the value that follows the given option in the command line, or None if the option is not given.
+    """
+    if option not in argv:
+        return None
+    index = argv.index(option)
+    if index + 1 >= len(argv):
+        print(f'Missing value for option {option}.')
         exit(1)
+    return argv[index + 1]
 
-    file = pathlib.Path(argv[1])
 
-    if '-v' in argv:
-        State.verbose = True
+def print_memo_counters(memo: FunctionMemo) -> None:
+    print(f'Memoized calls: {memo.hits} hits, {memo.misses} misses, {memo.skipped} impure or not memoizable')
+
+
+def interpret_pipelined(tokens: Iterable[Token], processor: Processor) -> None:
+    """
+        Parse, resolve and interpret one top-level statement at a time, so that each statement runs as soon as its tokens are read.
+        All the statements share the same global scope layout.
+    """
+    layout = ScopeLayout()
+
+    for statement_tokens in split_statements(tokens):
+        syntax_tree = SyntaxTree()
+        syntax_tree.layout = layout
+        syntax_tree.parse_tokens(statement_tokens)
+        optimize_tree(syntax_tree)
 
-    source_code = load_file(file)
-    State.source_code = source_code
+        if State.verbose:
+            print(syntax_tree, end='\n\n')
+
+        resolve_tree(syntax_tree)
+        processor.interpret_tree(syntax_tree)
+        # Show the output of every statement as soon as it runs
+        output.flush()
+
+        # A break or continue outside of a loop stops the program
+        if processor.should_continue_or_break:
+            break
 
-    tokens = tokenize_source_code(source_code)
+
+def compile_program(source_file: TextIO, use_bytecode: bool) -> Union[SyntaxTree, CodeObject]:
+    """
+        Tokenize and parse the whole source code into an optimized and resolved syntax tree, and compile it to bytecode if requested.
+    """
+    tokens = list(stream_tokens(source_file))
 
     if State.verbose:
         print(tokens, end='\n\n')
 
     syntax_tree = SyntaxTree()
     syntax_tree.parse_tokens(tokens)
+    optimize_tree(syntax_tree)
 
     if State.verbose:
         print(syntax_tree, end='\n\n')
 
-    processor = Processor()
+    resolve_tree(syntax_tree)
+
+    if not use_bytecode:
+        return syntax_tree
+
+    code = compile_tree(syntax_tree)
+
+    if State.verbose:
+        print(code, end='\n\n')
+
+    return code
+
+
+def add_memo_counts(processor: Processor, statistics: RunStatistics) -> None:
+    if processor.memo is None:
+        return
+    statistics.counts['memo hits'] = processor.memo.hits
+    statistics.counts['memo misses'] = processor.memo.misses
+    statistics.counts['memo skipped calls'] = processor.memo.skipped
+
+
+def run_with_statistics(file: pathlib.Path, use_bytecode: bool, processor: Processor, statistics: RunStatistics) -> None:
+    """
+        Load, tokenize, parse, optimize, resolve, compile if requested, and run the program one phase at a time,
+        recording the statistics of every phase. The program is always compiled from its source code, without the cache.
+    """
+    with statistics.measure('load'):
+        source = load_file(file)
+        State.source_code = source
+
+    with statistics.measure('tokenize'):
+        tokens = tokenize_source_code(source)
+    statistics.counts['tokens'] = len(tokens)
+
+    if State.verbose:
+        print(tokens, end='\n\n')
+
+    syntax_tree = SyntaxTree()
+    with statistics.measure('parse'):
+        syntax_tree.parse_tokens(tokens)
+    statistics.counts['tree nodes'] = count_tree_nodes(syntax_tree)
+    statistics.counts['top-level statements'] = len(syntax_tree.statements)
+
+    with statistics.measure('optimize'):
+        optimize_tree(syntax_tree)
+    statistics.counts['optimized tree nodes'] = count_tree_nodes(syntax_tree)
+
+    if State.verbose:
+        print(syntax_tree, end='\n\n')
+
+    with statistics.measure('resolve'):
+        resolve_tree(syntax_tree)
+
+    if not use_bytecode:
+        try:
+            with statistics.measure('execute'):
+                processor.interpret_tree(syntax_tree)
+        finally:
+            statistics.counts['statements executed'] = processor.executed_statements
+            add_memo_counts(processor, statistics)
+        return
+
+    with statistics.measure('compile'):
+        code = compile_tree(syntax_tree)
+    statistics.counts['compiled instructions'] = count_instructions(code)
+
+    if State.verbose:
+        print(code, end='\n\n')
 
     try:
-        processor.interpret_tree(syntax_tree)
+        with statistics.measure('execute'):
+            processor.execute_bytecode(code)
+    finally:
+        statistics.counts['instructions executed'] = processor.executed_instructions
+        add_memo_counts(processor, statistics)
+
+
+def run_command_line() -> None:
+
+    if len(argv) < 2:
+        print('No source code file specified.')
+        exit(1)
+
+    file = pathlib.Path(argv[1])
+
+    if '-v' in argv:
+        State.verbose = True
+
+    output_buffer_size = get_option_value('--output-buffer')
+    if output_buffer_size is not None and not output_buffer_size.isdigit():
+        print(f'Invalid output buffer size "{output_buffer_size}", expected a number of characters.')
+        exit(1)
+    if State.verbose:
+        # Verbose output is printed directly, so the output of the program must not be held back
+        output.configure(0, False)
+    else:
+        # Terminals show every line as soon as it is printed
+        output.configure(output.DEFAULT_BUFFER_SIZE if output_buffer_size is None else int(output_buffer_size), sys.stdout.isatty())
+
+    # Stream the source code instead of loading it in memory
+    State.source_file = file
+    source_file = open_file(file)
+
+    memo = None
+    if '--memoize' in argv or '--memoize-size' in argv:
+        memo_size = get_option_value('--memoize-size')
+        if memo_size is not None and not memo_size.isdigit():
+            print(f'Invalid memo size "{memo_size}", expected a number of results.')
+            exit(1)
+        memo = FunctionMemo(DEFAULT_MEMO_SIZE if memo_size is None else int(memo_size))
+
+    processor = Processor(memo, State.verbose)
+
+    if '--stats' in argv or '--stats-json' in argv:
+        source_file.close()
+
+        stats_path = get_option_value('--stats-json')
+
+        statistics = RunStatistics('--trace-memory' in argv)
+
+        def execute() -> None:
+            # Report the statistics even if the program exits early
+            try:
+                run_with_statistics(file, '--bytecode' in argv, processor, statistics)
+            finally:
+                output.flush()
+                write_report(statistics, stats_path)
+
+    elif '--profile' in argv or '--profile-collapsed' in argv:
+        collapsed_path = get_option_value('--profile-collapsed')
+
+        # Profiles are recorded by the tree walker, which knows the source line of every statement
+        cache = None if '--no-cache' in argv else ProgramCache(file)
+        syntax_tree = None if cache is None else cache.load('tree')
+        if syntax_tree is None:
+            syntax_tree = compile_program(source_file, False)
+            if cache is not None:
+                cache.store('tree', syntax_tree)
+        source_file.close()
+
+        profile = Profile()
+        processor = ProfilingProcessor(syntax_tree, profile, memo, State.verbose)
+
+        def execute() -> None:
+            # Report the profile even if the program exits early
+            try:
+                processor.interpret_tree(syntax_tree)
+            finally:
+                output.flush()
+                profile.print_report()
+                if collapsed_path is not None:
+                    profile.write_collapsed_stacks(collapsed_path)
+
+    elif '--pipeline' in argv and '--bytecode' not in argv:
+        execute = lambda: interpret_pipelined(stream_tokens(source_file), processor)
+
+    else:
+        use_bytecode = '--bytecode' in argv
+        kind = 'bytecode' if use_bytecode else 'tree'
+
+        cache = None if '--no-cache' in argv else ProgramCache(file)
+        program = None if cache is None else cache.load(kind)
+
+        if program is None:
+            program = compile_program(source_file, use_bytecode)
+            if cache is not None:
+                cache.store(kind, program)
+
+        elif State.verbose:
+            print(f'Loaded the {kind} of {file} from the cache', end='\n\n')
+        
+        source_file.close()
+
+        if use_bytecode:
+            execute = lambda: processor.execute_bytecode(program)
+        else:
+            execute = lambda: processor.interpret_tree(program)
+
+    try:
+        execute()
     except KeyboardInterrupt:
+        output.flush()
         print('\nInterrupted by user.')
         exit(1)
+    finally:
+        output.flush()
+        if memo is not None and State.verbose:
+            print_memo_counters(memo)
+
+
+def main() -> None:
+    try:
+        run_command_line()
+    except errors.ReverseError as error:
+        errors.print_error(error)
+        exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,202 @@
+import weakref
+from collections import OrderedDict
+from typing import Any, Hashable, List, Tuple, Union
+
+import src.arrays as arrays
+import src.strings as strings
+from src.compiler import CodeObject, OpCode
+from src.operations import get_builtin_handler
+from src.symbols import UserFunction
+from src.token import Token, TokenType
+
+
+# Built-in functions whose result or effects depend on something else than their arguments
+IMPURE_BUILTINS = frozenset(('print', 'println', 'getInput', 'getRandom', 'exit', 'sleep', 'getTime'))
+
+# Default maximum number of results kept in the memo
+DEFAULT_MEMO_SIZE = 4096
+
+# Types of the values that can be part of a memo key, besides pure functions and arrays of these values
+KEY_VALUE_TYPES = frozenset((TokenType.NUMBER, TokenType.STRING, TokenType.BOOLEAN, TokenType.NULL))
+
+
+def is_impure_call(name: str) -> bool:
+    return name in IMPURE_BUILTINS and get_builtin_handler(name) is not None
+
+
+def is_pure_body(statements: List[Token]) -> bool:
+    """
+        Return whether the statements of a function body, including the bodies of the functions declared in it,
+        never call impure built-in functions and never break out of or continue the loops of the caller.
+        Functions cannot access the symbols of other scopes, so any other function they call was passed to them, or declared by them.
+    """
+    # Tokens still to be checked, and whether they are inside a loop of the function
+    pending: List[Tuple[Token, bool]] = [(statement, False) for statement in statements]
+
+    while len(pending) > 0:
+        token, in_loop = pending.pop()
+
+        match token.type:
+
+            case TokenType.FUNCTION_CALL:
+                # value = [arguments: List[Token], name: Token]
+                if is_impure_call(token.value[1].value):
+                    return False
+
+            case TokenType.BREAK | TokenType.CONTINUE:
+                if not in_loop:
+                    return False
+
+            case TokenType.WHILE:
+                body, condition = token.children[0], token.children[1]
+                pending.append((body, True))
+                pending.append((condition, in_loop))
+                continue
+
+            case TokenType.FUNCTION_DECLARATION:
+                # value = [body: Token, parameters: List[Token], name: Token, layout: ScopeLayout, function: UserFunction]
+                pending.append((token.value[0], False))
+                continue
+
+        pending.extend((child, in_loop) for child in token.children)
+
+    return True
+
+
+def is_pure_code(code: CodeObject) -> bool:
+    """
+        Return whether the compiled function, including the functions declared in it, never calls impure built-in functions.
+        Compiled break and continue statements outside of loops only leave the function.
+    """
+    pending: List[CodeObject] = [code]
+
+    while len(pending) > 0:
+        code = pending.pop()
+
+        for opcode, operand in zip(code.opcodes, code.operands):
+            if opcode == OpCode.CALL_FUNCTION or opcode == OpCode.TAIL_CALL_FUNCTION:
+                # operand = (identifier: Token, argument_count: int, caller: Token)
+                if is_impure_call(operand[0].value):
+                    return False
+            elif opcode == OpCode.DECLARE_FUNCTION:
+                # operand = (identifier: Token, function: CodeObject)
+                pending.append(operand[1])
+
+    return True
+
+
+class FunctionMemo:
+    """
+        Results of the calls to pure user functions, keyed by function and argument values.
+        The least recently used results are evicted once the memo holds max_size results.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MEMO_SIZE) -> None:
+        self.max_size = max_size
+        self.results: OrderedDict[Hashable, Token] = OrderedDict()
+        # Purity of the functions that have been called, by their code.
+        # Keys of results hold the code itself rather than its id, so that the id of the code of a function
+        # is never reused by another function while its results are kept, like when a memo is shared by several programs.
+        # Purity is only kept as long as the code is alive.
+        self.purity: weakref.WeakKeyDictionary[Union[UserFunction, CodeObject], bool] = weakref.WeakKeyDictionary()
+
+        self.hits = 0
+        self.misses = 0
+        # Calls that could not be memoized, because the function is impure or an argument cannot be part of a key
+        self.skipped = 0
+
+
+    def is_pure(self, function: Token) -> bool:
+        """
+            Return whether the function value is pure, computing it the first time the function is seen.
+            Tree walker functions hold a UserFunction, compiled functions hold a CodeObject, which are compared by identity.
+        """
+        value = function.value
+        purity = self.purity.get(value)
+        if purity is None:
+            if isinstance(value, CodeObject):
+                purity = is_pure_code(value)
+            else:
+                purity = is_pure_body([value.return_expression, *value.body])
+            self.purity[value] = purity
+        return purity
+
+
+    def make_value_key(self, token: Token) -> Union[Hashable, None]:
+        """
+            Return a key that identifies the value of the token, or None if the value cannot be part of a key.
+            Numbers keep their Python type in the key, since integers and floats are printed differently.
+        """
+        if token.type == TokenType.STRING:
+            return (TokenType.STRING, strings.flatten(token.value))
+
+        if token.type in KEY_VALUE_TYPES:
+            return (token.type, type(token.value), token.value)
+
+        if token.type == TokenType.FUNCTION:
+            if not self.is_pure(token):
+                return None
+            return (TokenType.FUNCTION, token.value)
+
+        if token.type == TokenType.ARRAY:
+            value = token.value
+            if arrays.is_compact(value):
+                return (TokenType.ARRAY, value.typecode, value.tobytes())
+            elements: List[Hashable] = []
+            for element in value:
+                # Functions in arrays are not keyed, since they could be called with an impure function argument
+                if element.type == TokenType.FUNCTION:
+                    return None
+                element_key = self.make_value_key(element)
+                if element_key is None:
+                    return None
+                elements.append(element_key)
+            return (TokenType.ARRAY, tuple(elements))
+
+        return None
+
+
+    def make_key(self, function: Token, arguments: List[Token]) -> Union[Hashable, None]:
+        """
+            Return the key of a call to the function with the given arguments,
+            or None if the call cannot be memoized.
+        """
+        if not self.is_pure(function):
+            self.skipped += 1
+            return None
+
+        key: List[Any] = [function.value]
+        for argument in arguments:
+            try:
+                argument_key = self.make_value_key(argument)
+            except RecursionError:
+                # Arrays nested too deeply to be keyed
+                argument_key = None
+            if argument_key is None:
+                self.skipped += 1
+                return None
+            key.append(argument_key)
+
+        return tuple(key)
+
+
+    def get(self, key: Hashable) -> Union[Token, None]:
+        """
+            Return the memoized result of the call with the given key, or None if the call has not been memoized.
+        """
+        result = self.results.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.results.move_to_end(key)
+        return result
+
+
+    def store(self, key: Hashable, result: Token) -> None:
+        if self.max_size <= 0:
+            return
+        self.results[key] = result
+        if len(self.results) > self.max_size:
+            self.results.popitem(last=False)
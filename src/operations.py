@@ -1,8 +1,12 @@
 import random
+import sys
 import time
 from typing import Any, Callable, Dict, List, Tuple, Union
 
+import src.arrays as arrays
 import src.errors as errors
+import src.output as output
+import src.strings as strings
 from src.token import Token, TokenType, get_supported_operand_types
 from src.utils import SourceCodeLocation
 
@@ -14,10 +18,10 @@ def add(value1: Any, type1: TokenType, value2: Any, type2: TokenType, operator:
             return value1 + value2
 
         case (TokenType.STRING, TokenType.STRING):
-            return value1 + value2
+            return strings.concatenate(value1, value2)
 
         case (TokenType.ARRAY, TokenType.ARRAY):
-            return value1 + value2
+            return arrays.concatenate(value1, value2, operator.source_location)
 
     errors.type_error(
         get_supported_operand_types(TokenType.PLUS),
@@ -60,7 +64,7 @@ def divide(value1: Any, type1: TokenType, value2: Any, type2: TokenType, operato
 
         case (TokenType.NUMBER, TokenType.NUMBER):
             if value2 == 0:
-                errors.division_by_zero_error(operator.source_location)
+                errors.division_by_zero(operator.source_location)
             return value1 / value2
 
     errors.type_error(
@@ -76,7 +80,7 @@ def modulo(value1: Any, type1: TokenType, value2: Any, type2: TokenType, operato
 
         case (TokenType.NUMBER, TokenType.NUMBER):
             if value2 == 0:
-                errors.division_by_zero_error(operator.source_location)
+                errors.division_by_zero(operator.source_location)
             return value1 % value2
 
     errors.type_error(
@@ -122,16 +126,10 @@ def equal(value1: Any, type1: TokenType, value2: Any, type2: TokenType, operator
             return value1 == value2
 
         case (TokenType.STRING, TokenType.STRING):
-            return value1 == value2
+            return len(value1) == len(value2) and strings.flatten(value1) == strings.flatten(value2)
 
         case (TokenType.ARRAY, TokenType.ARRAY):
-            # Two array are equal if they have the same length and all elements are equal
-            if len(value1) != len(value2):
-                return False
-            for elem1, elem2 in zip(value1, value2):
-                if not equal(elem1, elem2):
-                    return False
-            return True
+            return arrays.are_equal(value1, value2)
 
         case (TokenType.BOOLEAN, TokenType.BOOLEAN):
             return value1 == value2
@@ -221,14 +219,14 @@ def not_(value: Any, type: TokenType, operator: Token) -> Any:
     )
 
 
-def array_index(array: List[Any], array_type: TokenType, index: int, index_type: TokenType, operator: Token) -> Any:
+def array_index(array: arrays.ArrayValue, array_type: TokenType, index: int, index_type: TokenType, operator: Token) -> Any:
     match (array_type, index_type):
 
         case (TokenType.ARRAY, TokenType.NUMBER):
             index -= 2
             if index < 0 or index >= len(array):
                 errors.array_index_out_of_bounds(len(array), index + 2, operator.source_location)
-            return array[index]
+            return arrays.get_element(array, index, operator.source_location)
 
     errors.type_error(
         get_supported_operand_types(TokenType.ARRAY_INDEX),
@@ -252,7 +250,7 @@ class BuiltinFunction:
 
     def check_argument_count(self, arguments: List[Token], source_location: SourceCodeLocation) -> None:
         if len(arguments) != len(self.supported_argument_types):
-            errors.argument_count_error(self.name, len(self.supported_argument_types), len(arguments), source_location)
+            errors.wrong_argument_count(self.name, len(self.supported_argument_types), len(arguments), source_location)
 
     
     def call(self, arguments: List[Token], caller: Token) -> Token:
@@ -269,20 +267,26 @@ def handle_print(arguments: List[Token], caller: Token) -> Token:
     argument = arguments[0]
 
     match argument.type:
+        case TokenType.ARRAY if arrays.is_compact(argument.value):
+            output.write(arrays.to_string(argument.value))
+
         case TokenType.ARRAY:
             # Recursively print all elements of the array
-            print('[', end='')
+            output.write('[')
             for index, elem in enumerate(argument.value):
                 handle_print([elem], caller)
                 if index != len(argument.value) - 1:
-                    print(', ', end='')
-            print(']', end='')
+                    output.write(', ')
+            output.write(']')
         
         case TokenType.NULL:
-            print('null', end='') 
+            output.write('null')
+
+        case TokenType.STRING:
+            output.write(strings.flatten(argument.value))
 
         case _:
-            print(arguments[0].value, end="")
+            output.write(str(arguments[0].value))
 
     # Build the return token value
     return Token(TokenType.NULL, 0, caller.source_location)
@@ -290,15 +294,18 @@ def handle_print(arguments: List[Token], caller: Token) -> Token:
 
 def handle_println(arguments: List[Token], caller: Token) -> Token:
     return_token = handle_print(arguments, caller)
-    print()
+    output.end_line()
     return return_token
 
 
 def handle_toNumber(arguments: List[Token], caller: Token) -> Token:
+    value = arguments[0].value
+    if arguments[0].type == TokenType.STRING:
+        value = strings.flatten(value)
     try:
-        return Token(TokenType.NUMBER, 0, caller.source_location, float(arguments[0].value))
+        return Token(TokenType.NUMBER, 0, caller.source_location, float(value))
     except ValueError:
-        errors.invalid_argument('toNumber', 0, arguments[0].value, caller.source_location)
+        errors.invalid_argument('toNumber', 0, value, caller.source_location)
 
 
 def handle_toString(arguments: List[Token], caller: Token) -> Token:
@@ -313,11 +320,14 @@ def handle_toString(arguments: List[Token], caller: Token) -> Token:
         case TokenType.BOOLEAN:
             return Token(TokenType.STRING, 0, caller.source_location, "true" if argument.value else "false")
         
+        case TokenType.ARRAY if arrays.is_compact(argument.value):
+            return Token(TokenType.STRING, 0, caller.source_location, arrays.to_string(argument.value))
+
         case TokenType.ARRAY:
             string = '['
             for element in argument.value:
                 # element is a Token
-                string += handle_toString([element], caller).value + ', '
+                string += strings.flatten(handle_toString([element], caller).value) + ', '
             # Remove the trailing ", " from the string, if any
             if len(argument.value) > 0:
                 string = string[:-2]
@@ -337,7 +347,11 @@ def handle_toBoolean(arguments: List[Token], caller: Token) -> Token:
 
 
 def handle_getInput(arguments: List[Token], caller: Token) -> Token:
-    return Token(TokenType.STRING, 0, caller.source_location, input())
+    try:
+        line = output.read_line()
+    except EOFError:
+        errors.end_of_input('getInput', caller.source_location)
+    return Token(TokenType.STRING, 0, caller.source_location, line)
 
 
 def handle_getRandom(arguments: List[Token], caller: Token) -> Token:
@@ -346,7 +360,9 @@ def handle_getRandom(arguments: List[Token], caller: Token) -> Token:
 
 def handle_exit(arguments: List[Token], caller: Token) -> Token:
     code = arguments[0].value
-    exit(code)
+    output.flush()
+    # Unlike the exit of the site module, sys.exit leaves sys.stdin open for the programs run after this one
+    sys.exit(code)
     # Return nothing, exiting the program
 
 
@@ -355,6 +371,7 @@ def handle_getLength(arguments: List[Token], caller: Token) -> Token:
 
 
 def handle_sleep(arguments: List[Token], caller: Token) -> Token:
+    output.flush()
     time.sleep(arguments[0].value)
     return Token(TokenType.NULL, 0, caller.source_location)
 
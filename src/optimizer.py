@@ -0,0 +1,126 @@
+from typing import Any, Callable, List, Union
+
+from src.compiler import binary_operations_table
+from src.syntax_tree import SyntaxTree
+from src.token import Token, TokenType, is_literal_type
+
+
+def is_constant(token: Token) -> bool:
+    """
+        Return whether the token is a literal whose value is known before execution.
+        Arrays are excluded, since their elements are evaluated when the array is reached.
+    """
+    return token.type != TokenType.ARRAY and is_literal_type(token.type)
+
+
+def try_operation(operation: Callable, *arguments: Any) -> Union[Any, None]:
+    """
+        Call the operation and return its result, or None if the operation fails.
+        The failing expression is left in the tree to report the error when, and if, it is executed.
+    """
+    try:
+        return operation(*arguments)
+    except Exception:
+        return None
+
+
+def fold_token(token: Token) -> Token:
+    """
+        Recursively replace the operators whose operands are all constant with their result.
+        Return the token that replaces the given one.
+    """
+    match token.type:
+
+        case TokenType.FUNCTION_DECLARATION:
+            # value = [body: Token, parameters: List[Token], name: Token, layout: ScopeLayout, function: UserFunction]
+            body_token: Token = token.value[0]
+            body_token.children = optimize_statements(body_token.children)
+            return token
+
+
+        case TokenType.IF | TokenType.WHILE:
+            # Fold the condition first, so that the bodies that are never executed are left as they are,
+            # to be removed by optimize_statements() without reporting the errors they could contain
+            condition = fold_token(token.children[1])
+            token.children[1] = condition
+            is_constant_condition = is_constant(condition)
+            is_true = condition.type == TokenType.BOOLEAN and condition.value == True
+
+            if not is_constant_condition or is_true:
+                body = token.children[0]
+                body.children = optimize_statements(body.children)
+
+            if len(token.children) == 3 and (not is_constant_condition or not is_true):
+                else_body = token.children[2].children[0]
+                else_body.children = optimize_statements(else_body.children)
+
+            return token
+
+
+        case TokenType.CURLY_BRACKET:
+            token.children = optimize_statements(token.children)
+            return token
+
+    # Fold the operands in place, since some tokens share their children list with their value
+    for index, child in enumerate(token.children):
+        token.children[index] = fold_token(child)
+
+    if token.type == TokenType.PARENTHESIS:
+        if len(token.children) == 1 and is_constant(token.children[0]):
+            return token.children[0]
+        return token
+
+    # Operators the parser left without operands are reported when, and if, they are executed
+    table_entry = binary_operations_table.get(token.type)
+    if table_entry is None or len(token.children) != 2:
+        return token
+
+    operand1, operand2 = token.children
+    if not is_constant(operand1) or not is_constant(operand2):
+        return token
+
+    operation, result_type = table_entry
+    result = try_operation(operation, operand1.value, operand1.type, operand2.value, operand2.type, token)
+    if result is None:
+        return token
+
+    # The result takes the source location of the operator, like the result computed at runtime
+    return Token(result_type or operand1.type, 0, token.source_location, result)
+
+
+def optimize_statements(statements: List[Token]) -> List[Token]:
+    """
+        Return the statements with their constant expressions folded and their dead branches removed.
+        The body of an if statement with a constant condition replaces the statement,
+        and while loops whose condition is constantly false are removed.
+    """
+    optimized: List[Token] = []
+
+    for statement in statements:
+        statement = fold_token(statement)
+
+        if statement.type == TokenType.IF and is_constant(statement.children[1]):
+            condition = statement.children[1]
+            if condition.type == TokenType.BOOLEAN and condition.value == True:
+                # Control flow bodies share the enclosing scope, so their statements can be moved into it
+                optimized.extend(statement.children[0].children)
+            elif len(statement.children) == 3:
+                optimized.extend(statement.children[2].children[0].children)
+            continue
+
+        if statement.type == TokenType.WHILE and is_constant(statement.children[1]):
+            condition = statement.children[1]
+            if condition.type != TokenType.BOOLEAN or condition.value != True:
+                continue
+
+        optimized.append(statement)
+
+    return optimized
+
+
+def optimize_tree(syntax_tree: SyntaxTree) -> None:
+    """
+        Fold the constant expressions and remove the dead branches of the syntax tree, before it is resolved.
+    """
+    syntax_tree.statements = optimize_statements(syntax_tree.statements)
+
@@ -0,0 +1,123 @@
+import sys
+import threading
+from typing import List, TextIO, Union
+
+
+# Default number of characters of output held before they are written to stdout
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class OutputBuffer:
+    """
+        Output of the print built-in functions, written to stdout in blocks instead of one write per printed value.
+
+        The buffer is flushed when it holds at least size characters, and whenever the output has to be visible,
+        like before reading input, sleeping, exiting or reporting an error.
+        Line buffered output is also flushed at the end of every line, which suits terminals.
+        The buffer writes to the given stream, or to the stdout of the moment it is flushed, so that redirections of stdout apply to it.
+        Input is read through the buffer as well, from the given stream or from stdin.
+    """
+
+    def __init__(self,
+                size: int = DEFAULT_BUFFER_SIZE,
+                line_buffered: bool = False,
+                stream: Union[TextIO, None] = None,
+                input_stream: Union[TextIO, None] = None
+            ) -> None:
+        self.size = size
+        self.line_buffered = line_buffered
+        self.stream = stream
+        self.input_stream = input_stream
+        self.parts: List[str] = []
+        # Number of characters in parts
+        self.length = 0
+
+
+    def write(self, text: str) -> None:
+        self.parts.append(text)
+        self.length += len(text)
+        if self.length >= self.size:
+            self.flush()
+
+
+    def end_line(self) -> None:
+        self.parts.append('\n')
+        self.length += 1
+        if self.line_buffered or self.length >= self.size:
+            self.flush()
+
+
+    def flush(self) -> None:
+        if len(self.parts) == 0:
+            return
+        text = ''.join(self.parts)
+        self.parts.clear()
+        self.length = 0
+        stream = sys.stdout if self.stream is None else self.stream
+        stream.write(text)
+        stream.flush()
+
+
+    def read_line(self) -> str:
+        """
+            Return the next line of input, without its line break, after showing the output printed so far, like a prompt.
+            Raise EOFError at the end of the input.
+        """
+        self.flush()
+        if self.input_stream is None:
+            return input()
+
+        line = self.input_stream.readline()
+        if line == '':
+            raise EOFError
+        return line[:-1] if line.endswith('\n') else line
+
+
+class ThreadOutput(threading.local):
+    """
+        Buffer of the output of the program being run by each thread, so that programs run by different threads do not mix their output.
+        Every thread starts with a buffer that writes to stdout.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = OutputBuffer()
+
+
+thread_output = ThreadOutput()
+
+
+def get_buffer() -> OutputBuffer:
+    return thread_output.buffer
+
+
+def set_buffer(buffer: OutputBuffer) -> OutputBuffer:
+    """
+        Make the given buffer the output buffer of the current thread and return the previous one, without flushing it.
+    """
+    previous_buffer = thread_output.buffer
+    thread_output.buffer = buffer
+    return previous_buffer
+
+
+def configure(size: int, line_buffered: bool) -> None:
+    """
+        Replace the output buffer of the current thread with one of the given size, flushing what the current one holds.
+        A size of 0 writes every printed value right away.
+    """
+    set_buffer(OutputBuffer(size, line_buffered)).flush()
+
+
+def write(text: str) -> None:
+    thread_output.buffer.write(text)
+
+
+def end_line() -> None:
+    thread_output.buffer.end_line()
+
+
+def flush() -> None:
+    thread_output.buffer.flush()
+
+
+def read_line() -> str:
+    return thread_output.buffer.read_line()
@@ -0,0 +1,250 @@
+import sys
+import time
+from typing import Dict, List, Set, Tuple, Union
+
+from src.state import State
+from src.symbols import ScopeLayout, SymbolTable
+from src.syntax_tree import SyntaxTree
+from src.token import Token, TokenType
+from src.utils import load_file
+from src.memo import FunctionMemo
+from src.vm import Processor
+
+
+# Name of the frame of the code outside of any function, in collapsed stacks
+MAIN_FRAME_NAME = '<main>'
+
+# Maximum number of source lines listed in the report, the hottest first
+MAX_REPORTED_LINES = 30
+
+
+class LineProfile:
+
+    def __init__(self, line_number: int) -> None:
+        self.line_number = line_number
+        # Number of statements of the line that were executed
+        self.executions = 0
+        # Seconds spent executing the statements of the line, including the statements they execute, like loop bodies and function calls
+        self.inclusive_time = 0.0
+        # Seconds spent executing the statements of the line, excluding the other statements they execute
+        self.self_time = 0.0
+        # Number of executions in progress, greater than 1 in recursive functions
+        self.active_executions = 0
+
+
+class FunctionProfile:
+
+    def __init__(self, name: str, line_number: int) -> None:
+        self.name = name
+        # Line of the declaration of the function
+        self.line_number = line_number
+        self.calls = 0
+        # Seconds spent in the function, including the functions it calls
+        self.inclusive_time = 0.0
+        # Seconds spent in the function, excluding the functions it calls
+        self.self_time = 0.0
+        # Number of calls in progress, greater than 1 in recursive functions
+        self.active_calls = 0
+
+
+    def get_frame_name(self) -> str:
+        return f'{self.name}:{self.line_number}'
+
+
+class Profile:
+    """
+        Execution counts and times of the source lines and of the user functions of a program.
+        Inclusive times of recursive lines and functions count only their outermost execution, so that they are not counted twice.
+    """
+
+    def __init__(self) -> None:
+        self.lines: Dict[int, LineProfile] = {}
+        self.functions: Dict[int, FunctionProfile] = {}
+        # Self time of the statements, by stack of the functions they were executed in and line
+        self.stacks: Dict[Tuple[Tuple[str, ...], int], float] = {}
+
+
+    def get_line(self, line_number: int) -> LineProfile:
+        line = self.lines.get(line_number)
+        if line is None:
+            line = LineProfile(line_number)
+            self.lines[line_number] = line
+        return line
+
+
+    def print_report(self) -> None:
+        """
+            Print the profile of the functions and of the hottest lines to stderr, so that it does not mix with the output of the program.
+        """
+        source_lines = load_source_lines()
+
+        lines = ['', f'{"function":<24} {"line":>6} {"calls":>10} {"inclusive":>12} {"self":>12}']
+        for function in sorted(self.functions.values(), key=lambda function: function.inclusive_time, reverse=True):
+            if function.calls == 0:
+                continue
+            lines.append(
+                f'{function.name:<24} {function.line_number:>6} {function.calls:>10} '
+                f'{function.inclusive_time * 1000:>9.2f} ms {function.self_time * 1000:>9.2f} ms'
+            )
+
+        lines.append('')
+        lines.append(f'{"line":>6} {"executions":>10} {"inclusive":>12} {"self":>12}   source')
+        hottest_lines = sorted(self.lines.values(), key=lambda line: line.self_time, reverse=True)
+        for line in hottest_lines[:MAX_REPORTED_LINES]:
+            source = source_lines[line.line_number - 1].strip() if 0 < line.line_number <= len(source_lines) else ''
+            lines.append(
+                f'{line.line_number:>6} {line.executions:>10} '
+                f'{line.inclusive_time * 1000:>9.2f} ms {line.self_time * 1000:>9.2f} ms   {source}'
+            )
+        if len(hottest_lines) > MAX_REPORTED_LINES:
+            lines.append(f'... {len(hottest_lines) - MAX_REPORTED_LINES} more lines')
+
+        print('\n'.join(lines), file=sys.stderr)
+
+
+    def write_collapsed_stacks(self, path: str) -> None:
+        """
+            Write the self time of the statements, in microseconds, in the collapsed stack format read by flame graph tools.
+            Every stack lists the functions the statements were executed in, followed by the line of the statements.
+        """
+        try:
+            with open(path, 'w') as file:
+                for (stack, line_number), self_time in self.stacks.items():
+                    microseconds = round(self_time * 1_000_000)
+                    if microseconds > 0:
+                        file.write(f'{";".join(stack)};line {line_number} {microseconds}\n')
+        except OSError as error:
+            print(f'Could not write the profile to "{path}": {error.strerror}', file=sys.stderr)
+
+
+def load_source_lines() -> List[str]:
+    if State.source_code is None:
+        State.source_code = load_file(State.source_file)
+    return State.source_code.splitlines()
+
+
+class ProfilingSymbolTable(SymbolTable):
+    """
+        Symbol table that notifies the processor of the frames pushed and popped by the calls to user functions.
+    """
+
+    def __init__(self, processor: 'ProfilingProcessor') -> None:
+        super().__init__()
+        self.processor = processor
+
+
+    def push_frame(self, layout: ScopeLayout, arguments: List[Token]) -> None:
+        super().push_frame(layout, arguments)
+        self.processor.enter_function(layout)
+
+
+    def pop_frame(self) -> None:
+        self.processor.exit_function()
+        super().pop_frame()
+
+
+class ProfilingProcessor(Processor):
+    """
+        Tree walking processor that records the execution counts and times of the statements and of the user functions into a profile.
+        Statements are told apart from the expressions they contain by their identity, collected from the syntax tree before execution.
+    """
+
+    def __init__(self, syntax_tree: SyntaxTree, profile: Profile, memo: Union[FunctionMemo, None] = None, verbose: bool = False) -> None:
+        super().__init__(memo, verbose)
+        self.symbol_table = ProfilingSymbolTable(self)
+        self.profile = profile
+
+        self.statement_ids: Set[int] = set()
+        collect_statements(syntax_tree, self.statement_ids, profile)
+
+        # Time spent in the statements executed by each statement being executed, the outermost first
+        self.child_times: List[float] = [0.0]
+
+        # Functions being called, the outermost first, with their start time
+        self.calls: List[Tuple[FunctionProfile, float]] = []
+        # Time spent in the functions called by each function being called, the outermost first
+        self.callee_times: List[float] = [0.0]
+        # Functions being called, as a collapsed stack
+        self.stack: Tuple[str, ...] = (MAIN_FRAME_NAME,)
+
+
+    def interpret_statement(self, root: Token) -> Token:
+        if id(root) not in self.statement_ids:
+            return super().interpret_statement(root)
+
+        line_number = root.source_location.line_number if root.source_location is not None else 0
+        line = self.profile.get_line(line_number)
+        line.executions += 1
+        line.active_executions += 1
+        stack = self.stack
+
+        self.child_times.append(0.0)
+        start = time.perf_counter()
+        try:
+            return super().interpret_statement(root)
+
+        finally:
+            elapsed = time.perf_counter() - start
+            self_time = elapsed - self.child_times.pop()
+            self.child_times[-1] += elapsed
+
+            line.active_executions -= 1
+            if line.active_executions == 0:
+                line.inclusive_time += elapsed
+            line.self_time += self_time
+
+            key = (stack, line_number)
+            self.profile.stacks[key] = self.profile.stacks.get(key, 0.0) + self_time
+
+
+    def enter_function(self, layout: ScopeLayout) -> None:
+        function = self.profile.functions[id(layout)]
+        function.calls += 1
+        function.active_calls += 1
+        self.calls.append((function, time.perf_counter()))
+        self.callee_times.append(0.0)
+        self.stack = self.stack + (function.get_frame_name(),)
+
+
+    def exit_function(self) -> None:
+        function, start = self.calls.pop()
+        elapsed = time.perf_counter() - start
+
+        function.active_calls -= 1
+        if function.active_calls == 0:
+            function.inclusive_time += elapsed
+        function.self_time += elapsed - self.callee_times.pop()
+        self.callee_times[-1] += elapsed
+
+        self.stack = self.stack[:-1]
+
+
+def collect_statements(syntax_tree: SyntaxTree, statement_ids: Set[int], profile: Profile) -> None:
+    """
+        Add the identities of the statements of the syntax tree to the set, and the functions it declares to the profile.
+        Statements are the top-level tokens and the children of code blocks, like loop and function bodies.
+    """
+    pending: List[Token] = []
+    for statement in syntax_tree.statements:
+        statement_ids.add(id(statement))
+        pending.append(statement)
+
+    while len(pending) > 0:
+        token = pending.pop()
+        pending.extend(token.children)
+
+        if token.type == TokenType.CURLY_BRACKET:
+            statement_ids.update(id(statement) for statement in token.children)
+
+        elif token.type == TokenType.RETURN:
+            # Functions evaluate the expression of their return statement directly
+            statement_ids.add(id(token.children[0]))
+
+        elif token.type == TokenType.FUNCTION_DECLARATION:
+            # value = [body: Token, parameters: List[Token], name: Token, layout: ScopeLayout, function: UserFunction]
+            body_token: Token = token.value[0]
+            identifier_token: Token = token.value[2]
+            layout: Union[ScopeLayout, None] = token.value[3]
+
+            pending.append(body_token)
+            profile.functions[id(layout)] = FunctionProfile(identifier_token.value, identifier_token.source_location.line_number)
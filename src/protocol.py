@@ -0,0 +1,46 @@
+"""
+    Protocol between the program server and its clients, over a Unix domain socket.
+
+    The client sends one request, a JSON object on a single line, with the "source" code of the program,
+    the "stdin" of the program and whether to run it on the "bytecode" engine.
+    Source files are read by the client, so that the server never opens files on behalf of its clients.
+    The server answers with frames made of a one byte kind, a four byte big-endian payload length and the payload:
+    output frames stream the output of the program as it is printed, and a final exit frame holds its exit code.
+
+    This module does not import the interpreter, so that clients start quickly.
+"""
+
+import json
+import socket
+import struct
+from typing import Any, BinaryIO, Dict, Iterator, Tuple
+
+
+OUTPUT_FRAME = b'o'
+EXIT_FRAME = b'x'
+
+FRAME_HEADER = struct.Struct('>cI')
+
+
+def send_request(connection: socket.socket, request: Dict[str, Any]) -> None:
+    connection.sendall(json.dumps(request).encode() + b'\n')
+
+
+def read_request(file: BinaryIO) -> Dict[str, Any]:
+    return json.loads(file.readline())
+
+
+def send_frame(connection: socket.socket, kind: bytes, payload: bytes) -> None:
+    connection.sendall(FRAME_HEADER.pack(kind, len(payload)) + payload)
+
+
+def read_frames(file: BinaryIO) -> Iterator[Tuple[bytes, bytes]]:
+    """
+        Yield the kind and the payload of the frames read from the file, until the connection is closed.
+    """
+    while True:
+        header = file.read(FRAME_HEADER.size)
+        if len(header) < FRAME_HEADER.size:
+            return
+        kind, length = FRAME_HEADER.unpack(header)
+        yield kind, file.read(length)
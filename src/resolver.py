@@ -0,0 +1,65 @@
+from typing import List
+
+from src.operations import get_builtin_handler
+from src.symbols import ScopeLayout, UserFunction
+from src.syntax_tree import SyntaxTree
+from src.token import Token, TokenType
+
+
+def resolve_statements(statements: List[Token], layout: ScopeLayout) -> None:
+    for statement in statements:
+        resolve_token(statement, layout)
+
+
+def resolve_token(token: Token, layout: ScopeLayout) -> None:
+    """
+        Recursively assign a slot of the given scope layout to every identifier in the token.
+        Control flow bodies share the scope they appear in, function bodies get a new scope.
+    """
+    match token.type:
+
+        case TokenType.IDENTIFIER:
+            token.slot = layout.get_slot(token.value)
+
+
+        case TokenType.FUNCTION_DECLARATION:
+            # value = [body: Token, parameters: List[Token], name: Token, layout: ScopeLayout, function: UserFunction]
+            body_token: Token = token.value[0]
+            parameters_token_list: List[Token] = token.value[1]
+            identifier_token: Token = token.value[2]
+
+            identifier_token.slot = layout.get_slot(identifier_token.value)
+
+            function_layout = ScopeLayout([parameter.value for parameter in parameters_token_list])
+            for parameter in parameters_token_list:
+                parameter.slot = function_layout.get_slot(parameter.value)
+
+            resolve_statements(body_token.children, function_layout)
+            token.value[3] = function_layout
+            token.value[4] = UserFunction(identifier_token.value, function_layout, body_token.children)
+
+
+        case TokenType.FUNCTION_CALL:
+            # value = [arguments: List[Token], name: Token]
+            identifier_token: Token = token.value[1]
+
+            # Built-in functions are looked up by name and take precedence over symbols
+            if get_builtin_handler(identifier_token.value) is None:
+                identifier_token.slot = layout.get_slot(identifier_token.value)
+
+            resolve_statements(token.children, layout)
+
+
+        case _:
+            resolve_statements(token.children, layout)
+
+
+def resolve_tree(syntax_tree: SyntaxTree) -> None:
+    """
+        Assign slots to the identifiers of the syntax tree, storing the global scope layout in the tree.
+        Resolving more statements later on extends the same global layout.
+    """
+    if syntax_tree.layout is None:
+        syntax_tree.layout = ScopeLayout()
+
+    resolve_statements(syntax_tree.statements, syntax_tree.layout)
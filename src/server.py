@@ -0,0 +1,227 @@
+"""
+    Server that runs Reverse Language programs submitted by clients over a Unix domain socket.
+
+    The interpreter is imported once, then the server forks the workers, which share the imported modules copy-on-write
+    and take turns accepting connections on the same socket. Every worker runs at most a given number of programs,
+    then exits and is replaced by a new one forked from the server, so that memory does not build up over time.
+
+    Programs that run for longer than the timeout are stopped, and the client gets an error.
+
+    Usage: python3 -m src.server <socket> [--workers <count>] [--max-jobs <count>] [--timeout <seconds>]
+
+    Programs are submitted with the client: python3 -m src.client <socket> <source file> [--bytecode] [--stdin]
+"""
+
+import io
+import os
+import pathlib
+import signal
+import socket
+import sys
+import traceback
+from sys import argv
+from typing import Any, Dict, Set
+
+import src.errors as errors
+import src.protocol as protocol
+from src.api import run_source
+
+
+# Number of programs a worker runs before it is replaced by a new one
+DEFAULT_MAX_JOBS = 1000
+
+# Seconds after which a program is stopped
+DEFAULT_TIMEOUT = 60.0
+
+# Connections waiting to be accepted by a worker
+LISTEN_BACKLOG = 128
+
+
+class RequestTimeout(BaseException):
+    """
+        Raised in a worker when its program runs out of time.
+        It is not an Exception, so that nothing in the interpreter mistakes it for an error of the program.
+    """
+
+
+def raise_timeout(signal_number: int, frame: Any) -> None:
+    raise RequestTimeout()
+
+
+class OutputStream:
+    """
+        Stream that sends the output of a program to the client as output frames.
+    """
+
+    def __init__(self, connection: socket.socket) -> None:
+        self.connection = connection
+
+
+    def write(self, text: str) -> None:
+        protocol.send_frame(self.connection, protocol.OUTPUT_FRAME, text.encode())
+
+
+    def flush(self) -> None:
+        pass
+
+
+def run_request(request: Dict[str, Any], stream: OutputStream, timeout: float) -> int:
+    """
+        Run the program of the request, sending its output to the stream, and return its exit code.
+        Errors of the program are reported the way the command line interface reports them.
+        The program is stopped if it runs for longer than the timeout, in seconds.
+    """
+    source = request.get('source')
+    if not isinstance(source, str):
+        stream.write('The request has no source code\n')
+        return 1
+
+    try:
+        try:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+            exit_code = run_source(source, io.StringIO(request.get('stdin', '')), stream, request.get('bytecode', False))
+        finally:
+            # Cancel the timer before anything else, so that it cannot stop the worker after the program ended
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    except RequestTimeout:
+        stream.write(f'Stopped after {timeout:g} seconds\n')
+        return 1
+
+    except errors.ReverseError as error:
+        stream.write('\n'.join([error.message, *errors.get_source_context(source, error.source_location)]) + '\n')
+        return 1
+
+    # Exit codes that are not integers are reported as a failure, like Python does
+    return exit_code if isinstance(exit_code, int) else 1
+
+
+def handle_connection(connection: socket.socket, timeout: float) -> None:
+    with connection:
+        stream = OutputStream(connection)
+        try:
+            request = protocol.read_request(connection.makefile('rb'))
+            try:
+                exit_code = run_request(request, stream, timeout)
+            except Exception as error:
+                # Errors of the interpreter itself end the program but not the worker.
+                # The traceback is logged by the server, the client only learns that the program failed.
+                traceback.print_exc()
+                stream.write(f'Internal error of the interpreter: {type(error).__name__}\n')
+                exit_code = 1
+            protocol.send_frame(connection, protocol.EXIT_FRAME, str(exit_code).encode())
+
+        except (OSError, ValueError):
+            # The client disconnected, or sent a malformed request
+            pass
+
+
+def run_worker(listener: socket.socket, max_jobs: int, timeout: float) -> None:
+    signal.signal(signal.SIGALRM, raise_timeout)
+    for _ in range(max_jobs):
+        connection, _ = listener.accept()
+        handle_connection(connection, timeout)
+
+
+def start_worker(listener: socket.socket, max_jobs: int, timeout: float) -> int:
+    """
+        Fork a worker and return its process id. The worker never returns from this function.
+    """
+    pid = os.fork()
+    if pid != 0:
+        return pid
+
+    exit_code = 0
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        run_worker(listener, max_jobs, timeout)
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        # Leave without running the cleanup of the server, which the worker inherited
+        os._exit(exit_code)
+
+
+def serve(socket_path: pathlib.Path, worker_count: int, max_jobs: int, timeout: float) -> None:
+    """
+        Serve the programs submitted to the socket until the server is interrupted or terminated.
+    """
+    if socket_path.is_socket():
+        # Left behind by a server that did not shut down cleanly
+        socket_path.unlink()
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(socket_path))
+    listener.listen(LISTEN_BACKLOG)
+
+    # Terminating the server shuts it down like an interruption does
+    signal.signal(signal.SIGTERM, lambda signal_number, frame: sys.exit(0))
+
+    workers: Set[int] = set()
+    try:
+        for _ in range(worker_count):
+            workers.add(start_worker(listener, max_jobs, timeout))
+        print(f'Serving on {socket_path} with {worker_count} workers', file=sys.stderr)
+
+        while True:
+            pid, _ = os.wait()
+            if pid in workers:
+                # Replace the workers that ran their maximum number of programs, or crashed
+                workers.remove(pid)
+                workers.add(start_worker(listener, max_jobs, timeout))
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        listener.close()
+        socket_path.unlink(missing_ok=True)
+
+
+def get_count_option(option: str, default: int) -> int:
+    if option not in argv:
+        return default
+    index = argv.index(option)
+    if index + 1 >= len(argv) or not argv[index + 1].isdigit() or int(argv[index + 1]) < 1:
+        print(f'Expected a positive number after option {option}.')
+        exit(1)
+    return int(argv[index + 1])
+
+
+def get_timeout_option() -> float:
+    if '--timeout' not in argv:
+        return DEFAULT_TIMEOUT
+    index = argv.index('--timeout')
+    try:
+        timeout = float(argv[index + 1])
+    except (IndexError, ValueError):
+        timeout = 0.0
+    if timeout <= 0:
+        print('Expected a positive number of seconds after option --timeout.')
+        exit(1)
+    return timeout
+
+
+def main() -> None:
+    if len(argv) < 2 or argv[1].startswith('-'):
+        print('No socket path specified.')
+        exit(1)
+
+    serve(
+        pathlib.Path(argv[1]),
+        get_count_option('--workers', os.cpu_count() or 1),
+        get_count_option('--max-jobs', DEFAULT_MAX_JOBS),
+        get_timeout_option()
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 
 
+import pathlib
 from typing import Union
 
 
@@ -7,5 +8,8 @@ class State:
 
     source_code: Union[str, None] = None
 
+    # File the source code is streamed from, when it is not loaded in source_code
+    source_file: Union[pathlib.Path, None] = None
+
     verbose: bool = False
 
@@ -0,0 +1,157 @@
+import contextlib
+import json
+import sys
+import time
+import tracemalloc
+from typing import Dict, Iterator, List, Union
+
+from src.compiler import CodeObject, OpCode
+from src.syntax_tree import SyntaxTree
+from src.token import Token, TokenType
+
+
+# Report format, to be increased whenever the layout of the JSON report changes
+STATS_FORMAT = 1
+
+
+class PhaseStatistics:
+
+    def __init__(self, name: str, wall_time: float, peak_memory: Union[int, None]) -> None:
+        self.name = name
+        # Seconds
+        self.wall_time = wall_time
+        # Bytes allocated on top of the memory in use at the start of the phase, at the peak of the phase,
+        # or None if memory is not traced
+        self.peak_memory = peak_memory
+
+
+class RunStatistics:
+    """
+        Wall time and peak memory of each phase of a run of the interpreter, and counts of what the phases produced.
+        Memory is traced with tracemalloc only if requested, since tracing slows down the phases many times over
+        and makes their wall time meaningless.
+    """
+
+    def __init__(self, trace_memory: bool) -> None:
+        self.trace_memory = trace_memory
+        self.phases: List[PhaseStatistics] = []
+        self.counts: Dict[str, int] = {}
+
+
+    @contextlib.contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """
+            Record the wall time and the peak memory of the code run in the context as the given phase.
+            The phase is recorded even if the code exits early, like programs calling exit.
+        """
+        if not self.trace_memory:
+            start_time = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.phases.append(PhaseStatistics(name, time.perf_counter() - start_time, None))
+            return
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        tracemalloc.reset_peak()
+        start_memory, _ = tracemalloc.get_traced_memory()
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start_time
+            _, peak_memory = tracemalloc.get_traced_memory()
+            self.phases.append(PhaseStatistics(name, wall_time, peak_memory - start_memory))
+
+
+    def to_json(self) -> str:
+        report = {
+            'format': STATS_FORMAT,
+            'memory_traced': self.trace_memory,
+            'phases': {
+                phase.name: {
+                    'wall_time': phase.wall_time,
+                    'peak_memory': phase.peak_memory,
+                }
+                for phase in self.phases
+            },
+            'counts': self.counts,
+        }
+        return json.dumps(report, indent=4)
+
+
+    def print_report(self) -> None:
+        """
+            Print the report to stderr, so that it does not mix with the output of the program.
+        """
+        lines = ['', f'{"phase":<12} {"wall time":>12} {"peak memory":>14}']
+        for phase in self.phases:
+            peak_memory = '-' if phase.peak_memory is None else f'{phase.peak_memory / 1024:.1f} KiB'
+            lines.append(f'{phase.name:<12} {phase.wall_time * 1000:>9.2f} ms {peak_memory:>14}')
+
+        total_time = sum(phase.wall_time for phase in self.phases)
+        lines.append(f'{"total":<12} {total_time * 1000:>9.2f} ms')
+        if self.trace_memory:
+            lines.append('Wall times include the overhead of memory tracing')
+        lines.append('')
+
+        for name, count in self.counts.items():
+            lines.append(f'{name:<24} {count:>10}')
+
+        print('\n'.join(lines), file=sys.stderr)
+
+
+def count_tree_nodes(syntax_tree: SyntaxTree) -> int:
+    """
+        Return the number of tokens in the syntax tree, including the bodies of the functions.
+    """
+    count = 0
+    pending: List[Token] = list(syntax_tree.statements)
+
+    while len(pending) > 0:
+        token = pending.pop()
+        count += 1
+        pending.extend(token.children)
+
+        if token.type == TokenType.FUNCTION_DECLARATION:
+            # value = [body: Token, parameters: List[Token], name: Token, layout: ScopeLayout, function: UserFunction]
+            pending.append(token.value[0])
+
+    return count
+
+
+def count_instructions(code: CodeObject) -> int:
+    """
+        Return the number of instructions of the code object and of the functions declared in it.
+    """
+    count = 0
+    pending: List[CodeObject] = [code]
+
+    while len(pending) > 0:
+        code = pending.pop()
+        count += len(code.opcodes)
+
+        for opcode, operand in zip(code.opcodes, code.operands):
+            if opcode == OpCode.DECLARE_FUNCTION:
+                # operand = (identifier: Token, function: CodeObject)
+                pending.append(operand[1])
+
+    return count
+
+
+def write_report(statistics: RunStatistics, path: Union[str, None]) -> None:
+    """
+        Print the report, and write it as JSON to the given path, if any.
+    """
+    statistics.print_report()
+
+    if path is None:
+        return
+
+    try:
+        with open(path, 'w') as file:
+            file.write(statistics.to_json())
+    except OSError as error:
+        print(f'Could not write the statistics to "{path}": {error.strerror}', file=sys.stderr)
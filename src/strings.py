@@ -0,0 +1,94 @@
+from typing import List, Union
+
+
+# Concatenations shorter than this are plain Python strings, since building a rope would cost more than copying them
+MIN_ROPE_LENGTH = 256
+
+
+class Rope:
+    """
+        A string made of chunks, built by appending to it, that is joined into a contiguous string only when needed.
+
+        Ropes are values, so appending to a rope returns a new rope instead of modifying it.
+        The new rope shares the chunk list of the old one and owns one more chunk of it,
+        which makes appending amortized constant time as long as every rope is appended to at most once,
+        like a string grown with += in a loop.
+        Appending to a rope whose chunk list has already been extended by another rope copies its text into a new list.
+    """
+
+    __slots__ = ('chunks', 'chunk_count', 'length', 'text')
+
+    def __init__(self, chunks: List[str], chunk_count: int, length: int) -> None:
+        # Chunks shared with the other ropes built from the same string, of which only the first chunk_count belong to this rope
+        self.chunks = chunks
+        self.chunk_count = chunk_count
+        self.length = length
+        # Contiguous text of the rope, joined the first time it is needed
+        self.text: Union[str, None] = None
+
+
+    def __len__(self) -> int:
+        return self.length
+
+
+    def __eq__(self, other: object) -> bool:
+        # Ropes compare like strings, also when they are elements of arrays
+        if isinstance(other, Rope):
+            return self.length == other.length and flatten(self) == flatten(other)
+        if isinstance(other, str):
+            return self.length == len(other) and flatten(self) == other
+        return NotImplemented
+
+
+    def __hash__(self) -> int:
+        return hash(flatten(self))
+
+
+    def __str__(self) -> str:
+        return flatten(self)
+
+
+    def __repr__(self) -> str:
+        return repr(flatten(self))
+
+
+# STRING values are either Python strings, or ropes built by appending to strings
+StringValue = Union[str, Rope]
+
+
+def is_rope(value: StringValue) -> bool:
+    return isinstance(value, Rope)
+
+
+def flatten(value: StringValue) -> str:
+    """
+        Return the contiguous text of the string.
+    """
+    if not isinstance(value, Rope):
+        return value
+    if value.text is None:
+        value.text = ''.join(value.chunks[:value.chunk_count])
+    return value.text
+
+
+def concatenate(value1: StringValue, value2: StringValue) -> StringValue:
+    """
+        Return the concatenation of the two strings, as a rope if the result is long enough.
+        Only appending is cheap, so a rope on the right is joined into a contiguous string first.
+    """
+    value2 = flatten(value2)
+
+    if not isinstance(value1, Rope):
+        if len(value1) + len(value2) < MIN_ROPE_LENGTH:
+            return value1 + value2
+        return Rope([value1, value2], 2, len(value1) + len(value2))
+
+    if len(value2) == 0:
+        return value1
+
+    chunks = value1.chunks
+    if value1.chunk_count != len(chunks):
+        # Another rope already appended to the shared chunks, so start new ones from the text of this rope
+        chunks = [flatten(value1)]
+    chunks.append(value2)
+    return Rope(chunks, len(chunks), value1.length + len(value2))
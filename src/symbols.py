@@ -1,141 +1,119 @@
 from __future__ import annotations
-from typing import Any, Dict, List
+from typing import Dict, List, Sequence, Union
 
 import src.errors as errors
-from src.token import TokenType, Token
+from src.token import Token
 
 
-class Symbol:
+class ScopeLayout:
+    """
+        Slots assigned by the resolver to the names of a scope.
+        Parameters take the first slots of a function scope.
+    """
 
-    def __init__(self, type: TokenType, value: Any) -> None:
-        self.type = type
-        self.value = value
+    def __init__(self, parameters: Sequence[str] = ()) -> None:
+        self.slots: Dict[str, int] = {}
+        self.parameter_slots: List[int] = [self.get_slot(parameter) for parameter in parameters]
 
 
-class Scope:
-
-    def __init__(self) -> None:
-        self.symbols: Dict[str, Symbol] = {}
-
-    
-    def set_symbol(self, name: str, value: Token) -> None:
+    def get_slot(self, name: str) -> int:
         """
-            Set the Symbol in the current scope.
-            If the value is an identifier, handle it as such
-            by retrieving the value from the current scope.
+            Return the slot of the given name, assigning a new one if the name is not in the scope yet.
         """
-        if value.type == TokenType.IDENTIFIER:
-            symbol = self.get_symbol(value)
-        elif value.type == TokenType.CURLY_BRACKET:
-            # Token value is a function body, store its statements
-            symbol = Symbol(TokenType.FUNCTION, value.children)
-        else:
-            symbol = Symbol(value.type, value.value)
-        
-        self.symbols[name] = symbol
-    
-
-    def get_symbol(self, identifier: Token) -> Symbol:
-        """
-            If the symbol is defined, return it.
-            If the symbol is not defined, raise an error.
-        """
-        try:
-            return self.symbols[identifier.value]
-        except KeyError:
-            errors.undefined_identifier(identifier.value, identifier.source_location)
-             
+        slot = self.slots.get(name)
+        if slot is None:
+            slot = len(self.slots)
+            self.slots[name] = slot
+        return slot
 
-    def set_symbol_value(self, name: str, value: Any) -> None:
-        """
-            Set the value of the symbol in the current scope.
-        """
-        self.symbols[name].value = value
-        
 
-class ScopeStack:
+    def __len__(self) -> int:
+        return len(self.slots)
 
-    def __init__(self) -> None:
-        self.stack: List[Scope] = []
 
-    
-    def get_symbol(self, identifier: Token) -> Symbol:
-        """
-            Get the Symbol from the current scope.
-            If the symbol is not defined, raise an error.
-        """
-        try:
-            return self.stack[-1].get_symbol(identifier)
-        except IndexError:
-            errors.undefined_identifier(identifier.value, identifier.source_location)
+class UserFunction:
+    """
+        A user function prepared once, at declaration, for the tree walker.
+        The expression of the return statement, which the parser guarantees to be the first statement of the body,
+        is kept apart, since it is evaluated after the rest of the body.
+    """
 
+    def __init__(self, name: str, layout: ScopeLayout, statements: List[Token]) -> None:
+        self.name = name
+        self.layout = layout
+        self.return_expression = statements[0].children[0]
+        # Statements of the body, without the return statement
+        self.body = statements[1:]
 
-    def set_symbol(self, name: str, value: Token) -> None:
-        """
-            Set the Symbol in the current scope.
-        """
-        self.stack[-1].set_symbol(name, value)
-    
 
-    def set_symbol_value(self, name: str, value: Any) -> None:
-        """
-            Set the value of the symbol in the current scope.
-        """
-        self.stack[-1].set_symbol_value(name, value)
-
-
-    def push_scope(self) -> None:
-        """
-            Push a new scope onto the stack.
-        """
-        self.stack.append(Scope())
-
-    
-    def pop_scope(self) -> None:
-        """
-            Pop the current scope off the stack.
-        """
-        self.stack.pop()
+# A frame holds the values of the symbols of a scope, indexed by slot.
+# Slots of symbols that have not been set yet hold None.
+Frame = List[Union[Token, None]]
 
 
 class SymbolTable:
 
     def __init__(self) -> None:
-        self.scope_stack = ScopeStack()
+        # Name to slot map of the global scope
+        self.global_layout = ScopeLayout()
+        self.frames: List[Frame] = [[]]
+        # Frame of the current scope
+        self.frame: Frame = self.frames[0]
 
-    
-    def get_symbol(self, identifier: Token) -> Symbol:
+
+    def get_symbol(self, identifier: Token) -> Token:
         """
-            Get the Symbol from the current scope.
+            Get the value of the identifier from the current scope.
             If the symbol is not defined, raise an error.
         """
-        return self.scope_stack.get_symbol(identifier)
+        value = self.frame[identifier.slot]
+        if value is None:
+            errors.undefined_identifier(identifier.value, identifier.source_location)
+        return value
+
+
+    def set_symbol(self, identifier: Token, value: Token) -> None:
+        """
+            Set the value of the identifier in the current scope.
+        """
+        self.frame[identifier.slot] = value
 
 
-    def set_symbol(self, name: str, value: Token) -> None:
+    def get_global(self, name: str) -> Union[Token, None]:
         """
-            Set the Symbol in the current scope.
+            Get the value of a global symbol by name, or None if it is not defined.
         """
-        self.scope_stack.set_symbol(name, value)
-    
+        slot = self.global_layout.slots.get(name)
+        if slot is None:
+            return None
+        return self.frames[0][slot]
 
-    def set_symbol_value(self, name: str, value: Any) -> None:
+
+    def set_global_layout(self, layout: ScopeLayout) -> None:
         """
-            Set the value of the symbol in the current scope.
+            Use the given global layout, growing the global frame to fit its slots.
+            The layout may still grow afterwards, as long as this method is called again before executing new code.
         """
-        self.scope_stack.set_symbol_value(name, value)
+        self.global_layout = layout
+        global_frame = self.frames[0]
+        global_frame.extend([None] * (len(layout) - len(global_frame)))
 
 
-    def push_scope(self) -> None:
+    def push_frame(self, layout: ScopeLayout, arguments: List[Token]) -> None:
         """
-            Push a new scope onto the stack.
+            Push a new frame for the given function scope onto the stack, binding the arguments to the parameters.
         """
-        self.scope_stack.push_scope()
+        frame: Frame = [None] * len(layout)
+        for slot, argument in zip(layout.parameter_slots, arguments):
+            frame[slot] = argument
+        self.frames.append(frame)
+        self.frame = frame
 
 
-    def pop_scope(self) -> None:
+    def pop_frame(self) -> None:
         """
-            Pop the current scope off the stack.
+            Pop the current frame off the stack.
         """
-        self.scope_stack.pop_scope()
-    
+        self.frames.pop()
+        self.frame = self.frames[-1]
+
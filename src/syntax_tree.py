@@ -1,7 +1,9 @@
 import enum
-from typing import List, Tuple, Union
+import heapq
+from typing import Iterable, Iterator, List, Tuple, Union
 
 import src.errors as errors
+from src.symbols import ScopeLayout
 from src.token import Token, TokenType, get_supported_operand_types, get_expression_result_types, is_literal_type
 
 
@@ -11,27 +13,200 @@ class Side(enum.IntEnum):
     RIGHT = 1
 
 
-def get_highest_priority_token(tokens: List[Token]) -> Tuple[Token, int]:
-    highest_priority_token = tokens[0]
-    highest_priority_index = 0
+# Index used to mark the absence of a token in TokenBuffer
+NO_TOKEN = -1
 
-    for index, token in enumerate(tokens):
 
-        if token.type == TokenType.SEMICOLON:
-            break
+class TokenBuffer:
+    """
+        Doubly linked view over a list of tokens, backed by arrays of next and previous indices.
+        Tokens are removed by unlinking them in O(1), the underlying list is never copied.
+        Positions are indices into the original token list and stay valid after removals.
+    """
 
-        if token.priority > highest_priority_token.priority:
-            highest_priority_token = token
-            highest_priority_index = index
-    
-    return highest_priority_token, highest_priority_index
+    def __init__(self, tokens: List[Token]) -> None:
+        self.tokens = tokens
+        count = len(tokens)
+        self.next: List[int] = list(range(1, count + 1))
+        self.prev: List[int] = list(range(-1, count - 1))
+        if count > 0:
+            self.next[-1] = NO_TOKEN
+        self.head = 0 if count > 0 else NO_TOKEN
+        # Flags of the tokens that have been unlinked
+        self.removed = bytearray(count)
+
+
+    def is_empty(self) -> bool:
+        return self.head == NO_TOKEN
+
+
+    def get_next(self, index: int) -> int:
+        return self.next[index]
+
+
+    def get_prev(self, index: int) -> int:
+        return self.prev[index]
+
+
+    def is_removed(self, index: int) -> bool:
+        return self.removed[index] != 0
+
+
+    def get_next_linked(self, index: int) -> int:
+        """
+            Return the position of the first linked token after the given, possibly removed, position.
+            Removed tokens keep their stale links, which only ever point forward, 
+            so following them never skips a linked token.
+        """
+        index = self.next[index]
+        while index != NO_TOKEN and self.removed[index]:
+            index = self.next[index]
+        return index
+
+
+    def get(self, index: int) -> Union[Token, None]:
+        """
+            Return the token at the given position, or None if there is no token.
+        """
+        if index == NO_TOKEN:
+            return None
+        return self.tokens[index]
+
+
+    def remove_range(self, first: int, last: int) -> None:
+        """
+            Unlink the tokens from the first to the last position, both included.
+        """
+        prev_index = self.prev[first]
+        next_index = self.next[last]
+
+        index = first
+        while index != next_index:
+            self.removed[index] = 1
+            index = self.next[index]
+
+        if prev_index == NO_TOKEN:
+            self.head = next_index
+        else:
+            self.next[prev_index] = next_index
+
+        if next_index != NO_TOKEN:
+            self.prev[next_index] = prev_index
+
+
+    def remove(self, index: int) -> Token:
+        """
+            Unlink the token at the given position and return it.
+        """
+        self.remove_range(index, index)
+        return self.tokens[index]
+
+
+    def drop_until(self, index: int) -> None:
+        """
+            Unlink every token up to the given position, included.
+        """
+        self.remove_range(self.head, index)
+
+
+def split_statements(tokens: Iterable[Token]) -> Iterator[List[Token]]:
+    """
+        Group the tokens into top-level statements, each ending with the semicolon that starts the next statement.
+        Semicolons inside curly brackets belong to the statement of the block.
+        Parsing the groups one by one produces the same statements as parsing all the tokens at once.
+    """
+    statement: List[Token] = []
+    curly_bracket_depth = 0
+
+    for token in tokens:
+        statement.append(token)
+
+        if token.type == TokenType.CURLY_BRACKET:
+            if token.value == '{':
+                curly_bracket_depth += 1
+            # Unmatched closing brackets are left to the parser
+            elif curly_bracket_depth > 0:
+                curly_bracket_depth -= 1
+
+        elif token.type == TokenType.SEMICOLON and curly_bracket_depth == 0:
+            yield statement
+            statement = []
+
+    if len(statement) > 0:
+        yield statement
+
+
+class OperatorQueue:
+    """
+        Priority queue of the operators in the statement being parsed, 
+        the statement being the tokens from the head of the buffer up to the next semicolon.
+        Entries are ordered by priority, then by position, so that the leftmost highest priority operator comes first.
+        Stale entries, whose token has been removed or already processed, are discarded lazily.
+    """
+
+    def __init__(self, tokens: TokenBuffer) -> None:
+        self.tokens = tokens
+        self.heap: List[Tuple[int, int]] = []
+        # Position of the semicolon that ends the statement
+        self.statement_end = NO_TOKEN
+        self.start_statement()
+
+
+    def start_statement(self) -> None:
+        """
+            Index the operators of the statement at the head of the buffer.
+        """
+        self.heap.clear()
+        self.index_tokens(self.tokens.head)
+
+
+    def index_tokens(self, index: int) -> None:
+        """
+            Add the operators from the given position up to the next semicolon to the queue.
+        """
+        while index != NO_TOKEN:
+            token = self.tokens.tokens[index]
+
+            if token.type == TokenType.SEMICOLON:
+                break
+
+            if token.priority > 0:
+                heapq.heappush(self.heap, (-token.priority, index))
+
+            index = self.tokens.next[index]
+
+        self.statement_end = index
+
+
+    def get_highest_priority_token(self) -> Tuple[Token, int]:
+        """
+            Return the leftmost highest priority token of the statement, or the first token of the
+            statement if all of its tokens have already been processed.
+        """
+        # The semicolon ending the statement may have been removed along with the contents of a block,
+        # in which case the statement extends up to the next semicolon.
+        if self.statement_end != NO_TOKEN and self.tokens.is_removed(self.statement_end):
+            self.index_tokens(self.tokens.get_next_linked(self.statement_end))
+
+        while len(self.heap) > 0:
+            negative_priority, index = self.heap[0]
+            token = self.tokens.tokens[index]
+
+            if token.priority == -negative_priority and not self.tokens.is_removed(index):
+                return token, index
+
+            heapq.heappop(self.heap)
+        
+        return self.tokens.tokens[self.tokens.head], self.tokens.head
 
 
 class SyntaxTree:
 
     def __init__(self) -> None:
         self.statements: List[Token] = []
-        self.tokens: Union[List[Token], None] = None
+        self.tokens: Union[TokenBuffer, None] = None
+        # Slots of the global scope, assigned by the resolver
+        self.layout: Union[ScopeLayout, None] = None
 
     
     def extract_binary_operands(self, index: int) -> List[Union[Token, None]]:
@@ -40,16 +215,13 @@ class SyntaxTree:
         Returns a list of operands, where None is used to indicate that the
         operand is not present (the error will be handled by check_operand_types()).
         """
-        op1_index = index - 2
-        if op1_index >= 0:
-            operand1 = self.tokens[op1_index]
-            # If (index - 2) is valid, (index - 1) is also valid.
-            operand2 = self.tokens[index - 1]
-
+        op2_index = self.tokens.get_prev(index)
+        op1_index = NO_TOKEN if op2_index == NO_TOKEN else self.tokens.get_prev(op2_index)
+        if op1_index != NO_TOKEN:
             # Remove the operands from the list only if there was no error.
             # In case of errors, the program will terminate anyways.
-            self.tokens = self.tokens[:index - 2] + self.tokens[index:]
-            return [operand1, operand2]
+            self.tokens.remove_range(op1_index, op2_index)
+            return [self.tokens.get(op1_index), self.tokens.get(op2_index)]
 
         else:
             return [None, None]
@@ -57,15 +229,12 @@ class SyntaxTree:
 
     def extract_unary_operand(self, index: int, side: Side) -> Union[Token, None]:
             if side == Side.LEFT:
-                operand_index = index - 1
-                if operand_index >= 0:
-                    return self.tokens.pop(operand_index)
-                return None
-
-            # if side == Side.RIGHT:
-            operand_index = index + 1
-            if operand_index < len(self.tokens):
-                return self.tokens.pop(operand_index)
+                operand_index = self.tokens.get_prev(index)
+            else:
+                operand_index = self.tokens.get_next(index)
+
+            if operand_index != NO_TOKEN:
+                return self.tokens.remove(operand_index)
             return None
 
     
@@ -101,19 +270,22 @@ class SyntaxTree:
 
     def parse_tokens(self, _tokens: List[Token]) -> None:
 
-        self.tokens = _tokens
+        self.tokens = TokenBuffer(_tokens)
+        operators = OperatorQueue(self.tokens)
 
         del _tokens
 
-        while len(self.tokens) > 0:
+        while not self.tokens.is_empty():
 
-            token, index = get_highest_priority_token(self.tokens)
+            token, index = operators.get_highest_priority_token()
             # Pass to the next statement if there is no token with higher priority
             if token.priority == 0:
                 # Append the root token to the list of statements
                 if token.type != TokenType.SEMICOLON:
                     self.statements.append(token)
-                self.tokens = self.tokens[index + 1:]
+                self.tokens.drop_until(index)
+                if token.type == TokenType.SEMICOLON:
+                    operators.start_statement()
                 continue
             
             # Set priority to 0 so that the token is not processed again
@@ -179,11 +351,10 @@ class SyntaxTree:
 
                     # Find the matching parenthesis in the statement and extract the children
                     depth = 1
-                    i = index + 1
+                    i = self.tokens.get_next(index)
                     while True:
-                        try:
-                            tok = self.tokens[i]
-                        except IndexError:
+                        tok = self.tokens.get(i)
+                        if tok is None:
                             errors.unbalanced_parentheses(token.source_location)
 
                         if tok.type == TokenType.PARENTHESIS:
@@ -201,25 +372,25 @@ class SyntaxTree:
                         elif tok.type != TokenType.COMMA:
                             children.append(tok)
                         
-                        i += 1
+                        i = self.tokens.get_next(i)
                     
-                    self.tokens = self.tokens[: index + 1] + self.tokens[i + 1 :]
+                    self.tokens.remove_range(self.tokens.get_next(index), i)
                     token.children = children
 
                     # Now, check what these parentheses are used for (function call, declaration, just a parenthesis)
                     
                     # Check if the next token is an identifier
-                    identifier_token_index = index + 1
-                    if identifier_token_index >= len(self.tokens):
+                    identifier_token_index = self.tokens.get_next(index)
+                    if identifier_token_index == NO_TOKEN:
                         continue
-                    identifier_token = self.tokens[identifier_token_index]
+                    identifier_token = self.tokens.get(identifier_token_index)
                     if identifier_token.type != TokenType.IDENTIFIER:
                         continue
                     
                     # Check if the previous token is a curly bracket
-                    curly_bracket_token_index = index - 1
-                    if curly_bracket_token_index >= 0:
-                        curly_bracket_token = self.tokens[curly_bracket_token_index]
+                    curly_bracket_token_index = self.tokens.get_prev(index)
+                    if curly_bracket_token_index != NO_TOKEN:
+                        curly_bracket_token = self.tokens.get(curly_bracket_token_index)
                         if curly_bracket_token.type == TokenType.CURLY_BRACKET:
                             # This is a function declaration: "{body} (args) name"
                             token.type = TokenType.FUNCTION_DECLARATION
@@ -230,11 +401,13 @@ class SyntaxTree:
                                 errors.missing_return_statement(identifier_token.value, curly_bracket_token.source_location)
 
                             # Update the token's value to include the function body, arguments and name
-                            # New format: [body, args, name]
-                            token.value = [curly_bracket_token, children, identifier_token]
+                            # New format: [body, args, name, layout, function]
+                            # The layout of the function scope and the prepared function are assigned later on by the resolver
+                            token.value = [curly_bracket_token, children, identifier_token, None, None]
                             
                             # Remove the curly bracket and idetifier from the list of tokens
-                            self.tokens = self.tokens[:curly_bracket_token_index] + [token] + self.tokens[identifier_token_index + 1:]
+                            self.tokens.remove(curly_bracket_token_index)
+                            self.tokens.remove(identifier_token_index)
                             continue
                 
                     # If the previous token is not a curly bracket, this is a function call
@@ -242,7 +415,7 @@ class SyntaxTree:
                     # Update the value to include the function name
                     token.value = [children, identifier_token]
                     # Remove the identifier from the list of tokens
-                    self.tokens.pop(identifier_token_index)
+                    self.tokens.remove(identifier_token_index)
 
 
                 case TokenType.SQUARE_BRACKET:
@@ -250,46 +423,40 @@ class SyntaxTree:
                         errors.unbalanced_square_brackets(token.source_location)
 
                     # Differentiate between array literal and array indexing
-                    try:
-                        next_token = self.tokens[index + 1]
-                    except IndexError:
+                    next_token_index = self.tokens.get_next(index)
+                    next_token = self.tokens.get(next_token_index)
+                    if next_token is None:
                         errors.unbalanced_square_brackets(token.source_location)
                     
                     # Check if brackets are empty
                     if next_token.type == TokenType.SQUARE_BRACKET and next_token.value == ']':
                         # Check if previous token is a number (the array index to be accessed)
-                        try:
-                            # Check if the previous token exists
-                            prev_token_index = index - 1
-                            if prev_token_index > 0:
-                                prev_token = self.tokens[prev_token_index]
-                                if prev_token.type in (TokenType.NUMBER, TokenType.IDENTIFIER, TokenType.PARENTHESIS):
-                                    # Check if the token before the previous token is an identifier
-                                    try:
-                                        # index - 2 is always >= 0, since index - 1 is always > 0
-                                        prev_prev_token = self.tokens[index - 2]
-                                        if prev_prev_token.type in (TokenType.IDENTIFIER, TokenType.ARRAY, TokenType.PARENTHESIS):
-                                            # The [] is an array indexing operator
-                                            token.type = TokenType.ARRAY_INDEXING
-                                            token.children = [prev_prev_token, prev_token]
-                                            self.tokens = self.tokens[: index - 2] + [token] + self.tokens[index + 2 :]
-                                            continue
-                                    
-                                    except IndexError:
-                                        pass   
-                        except IndexError:
-                            pass
+                        prev_token_index = self.tokens.get_prev(index)
+                        # Check if the previous token and the token before it exist
+                        if prev_token_index != NO_TOKEN and self.tokens.get_prev(prev_token_index) != NO_TOKEN:
+                            prev_token = self.tokens.get(prev_token_index)
+                            if prev_token.type in (TokenType.NUMBER, TokenType.IDENTIFIER, TokenType.PARENTHESIS):
+                                # Check if the token before the previous token is an identifier
+                                prev_prev_token_index = self.tokens.get_prev(prev_token_index)
+                                prev_prev_token = self.tokens.get(prev_prev_token_index)
+                                if prev_prev_token.type in (TokenType.IDENTIFIER, TokenType.ARRAY, TokenType.PARENTHESIS):
+                                    # The [] is an array indexing operator
+                                    token.type = TokenType.ARRAY_INDEXING
+                                    token.children = [prev_prev_token, prev_token]
+                                    self.tokens.remove_range(prev_prev_token_index, prev_token_index)
+                                    self.tokens.remove(next_token_index)
+                                    continue
 
                     # The token is a literal array
                     token.type = TokenType.ARRAY
+                    elements: List[Token] = []
 
                     # Find the matching bracket in the statement and extract the children
                     depth = 1
-                    i = index + 1
+                    i = self.tokens.get_next(index)
                     while True:
-                        try:
-                            tok = self.tokens[i]
-                        except IndexError:
+                        tok = self.tokens.get(i)
+                        if tok is None:
                             errors.unbalanced_square_brackets(token.source_location)
 
                         if tok.type == TokenType.SQUARE_BRACKET:
@@ -305,13 +472,14 @@ class SyntaxTree:
                             errors.unbalanced_square_brackets(tok.source_location)
                         
                         elif tok.type != TokenType.COMMA:
-                            token.children.append(tok)
+                            elements.append(tok)
                         
-                        i += 1
+                        i = self.tokens.get_next(i)
 
                     # Lastly, remove the brackets with their contents
-                    self.tokens = self.tokens[: index + 1] + self.tokens[i + 1 :]
-                    token.value = token.children
+                    self.tokens.remove_range(self.tokens.get_next(index), i)
+                    token.children = elements
+                    token.value = elements
 
                 
                 case TokenType.CURLY_BRACKET:
@@ -322,11 +490,10 @@ class SyntaxTree:
 
                     # Find the matching bracket
                     depth = 1
-                    i = index + 1
+                    i = self.tokens.get_next(index)
                     while True:
-                        try:
-                            tok = self.tokens[i]
-                        except IndexError:
+                        tok = self.tokens.get(i)
+                        if tok is None:
                             errors.unbalanced_curly_brackets(token.source_location)
 
                         if tok.type == TokenType.CURLY_BRACKET:
@@ -339,9 +506,9 @@ class SyntaxTree:
                                 depth += 1
                             
                         children.append(tok)                        
-                        i += 1
+                        i = self.tokens.get_next(i)
 
-                    self.tokens = self.tokens[: index + 1] + self.tokens[i + 1 :]
+                    self.tokens.remove_range(self.tokens.get_next(index), i)
 
                     # Parse the contents of the curly brackets into a tree structure
                     content_tree = SyntaxTree()
@@ -352,14 +519,14 @@ class SyntaxTree:
                 case TokenType.IF:
                     # Check for an else statement
                     has_else_statement = False
-                    next_token_index = index + 1
-                    if next_token_index < len(self.tokens):
-                        else_token = self.tokens[next_token_index]
+                    next_token_index = self.tokens.get_next(index)
+                    if next_token_index != NO_TOKEN:
+                        else_token = self.tokens.get(next_token_index)
                         if else_token.type == TokenType.ELSE:
                             # The else statement is present and already parsed
                             # Else statements have higher priority than if statements
                             has_else_statement = True
-                            self.tokens.pop(next_token_index)
+                            self.tokens.remove(next_token_index)
 
                     body, condition = self.extract_binary_operands(index)
                     self.check_operand_types(token, (body,), (TokenType.CURLY_BRACKET,))
@@ -381,8 +548,9 @@ class SyntaxTree:
 
                 case TokenType.ELSE:
                     # Check if the else statement is preceded by an if statement
-                    if_index = index - 2
-                    if if_index < 0 or self.tokens[if_index].type != TokenType.IF:
+                    body_index = self.tokens.get_prev(index)
+                    if_index = NO_TOKEN if body_index == NO_TOKEN else self.tokens.get_prev(body_index)
+                    if if_index == NO_TOKEN or self.tokens.get(if_index).type != TokenType.IF:
                         errors.else_without_if(token.source_location)
 
                     body = self.extract_unary_operand(index, Side.LEFT)
@@ -408,6 +576,9 @@ class SyntaxTree:
                     # The token type is not handled, raise an error
                     errors.unsupported_token(token.type, token.source_location)
 
+        # The token buffer is only needed while parsing
+        self.tokens = None
+
 
     def stringify_token(self, token: Token, depth: int) -> str:
         """
@@ -1,6 +1,5 @@
 import enum
-import copy
-from typing import Any, List, Tuple, Union
+from typing import Any, List, Sequence, Tuple, Union
 
 from src.utils import SourceCodeLocation
 
@@ -272,8 +271,44 @@ def get_supported_operand_types(token_type: TokenType) -> Tuple[TokenType]:
     return supported_operand_types_table[token_type]
 
 
+# Operators whose operands are their children, and parentheses, whose value is their first child.
+# The parser leaves an operator without children when another operator takes it as its operand
+# before the operands of the operator are extracted. The missing operands are reported when the operator is evaluated.
+operator_types = frozenset((
+    TokenType.PARENTHESIS,
+    TokenType.PLUS,
+    TokenType.MINUS,
+    TokenType.MULTIPLY,
+    TokenType.DIVIDE,
+    TokenType.MODULO,
+    TokenType.INCREMENT,
+    TokenType.DECREMENT,
+    TokenType.EQUAL,
+    TokenType.NOT_EQUAL,
+    TokenType.GREATER_THAN,
+    TokenType.LESS_THAN,
+    TokenType.GREATER_THAN_OR_EQUAL,
+    TokenType.LESS_THAN_OR_EQUAL,
+    TokenType.AND,
+    TokenType.OR,
+    TokenType.NOT,
+    TokenType.ASSIGNMENT,
+    TokenType.ASSIGNMENT_ADD,
+    TokenType.ASSIGNMENT_SUB,
+    TokenType.ASSIGNMENT_MUL,
+    TokenType.ASSIGNMENT_DIV,
+    TokenType.ASSIGNMENT_MOD,
+))
+
+
+# Children of the tokens that have no operands, shared to avoid allocating an empty list per token
+NO_CHILDREN: Tuple[()] = ()
+
+
 class Token:
 
+    __slots__ = ('type', 'priority', 'value', 'source_location', 'children', 'slot')
+
     def __init__(self, type: TokenType, base_priority: int, source_location: SourceCodeLocation, value: Any = None) -> None:
         self.type = type
         
@@ -284,11 +319,14 @@ class Token:
         
         self.value = value
         
-        # Copy the source code location of the token because it should not be modified
-        self.source_location = copy.copy(source_location)
+        # Source code locations are immutable, so they can be shared between tokens
+        self.source_location = source_location
         
         # List containing the token's operand, if the toke is an operator
-        self.children: List[Token] = []
+        self.children: Sequence[Token] = NO_CHILDREN
+
+        # Frame slot of the symbol, if the token is an identifier. Assigned by the resolver
+        self.slot: Union[int, None] = None
 
 
     def __str__(self) -> str:
@@ -1,4 +1,5 @@
-from typing import List, Union
+import re
+from typing import Dict, Iterable, Iterator, List, TextIO, Union
 
 import src.errors as errors
 from src.utils import SourceCodeLocation
@@ -14,7 +15,11 @@ def is_identifier_start(char: str) -> bool:
     return char.isalpha() or char == '_'
 
 
-def tokenize_source_code(source_code: str) -> List[Token]:
+def reference_tokenize_source_code(source_code: str) -> List[Token]:
+    """
+        Character by character tokenizer. 
+        It is the reference implementation of the language's lexical rules and is used by tokenize_source_code() for the inputs it does not handle itself.
+    """
     base_priority = 0
     parenthesis_depth = 0
     square_bracket_depth = 0
@@ -280,9 +285,8 @@ def tokenize_source_code(source_code: str) -> List[Token]:
             case ' ':
                 continue
             case '\n':
-                # Upon a newline update the source location
-                source_location.line_number += 1
-                source_location.line_start = index + 1
+                # Upon a newline move to a new source location, shared by all the tokens of the line
+                source_location = SourceCodeLocation(index + 1, source_location.line_number + 1)
                 continue
             case '\t':
                 continue
@@ -306,7 +310,270 @@ def tokenize_source_code(source_code: str) -> List[Token]:
     
     # If the source code ended with an unclosed parenthesis, raise an error
     if parenthesis_depth != 0:
-        errors.unbalanced_parentheses(parenthesis_depth, source_location)
+        errors.unbalanced_parentheses(source_location)
     
     return tokens
 
+
+
+# Whole lexemes matched by tokenize_source_code(), one named group per kind of lexeme.
+# Alternatives are tried in order, so longer operators must come before their prefixes.
+lexeme_pattern = re.compile(r'''
+    (?P<SPACE>[ \t\r]+)
+    | (?P<WORD>[^\W\d]\w*)
+    | (?P<OPERATOR>\+\+|\+=|--|-=|\*=|/=|%=|==|!=|>=|<=|&&|\|\||[-+*/%=!<>,;])
+    | (?P<NUMBER>\d+)
+    | (?P<NEWLINE>\n)
+    | (?P<PARENTHESIS>[()])
+    | (?P<SQUARE_BRACKET>[\[\]])
+    | (?P<CURLY_BRACKET>[{}])
+    | (?P<STRING>"[^"]*"?)
+    | (?P<COMMENT>\\\\[^\n]*)
+    | (?P<OTHER>.)
+''', re.VERBOSE | re.DOTALL)
+
+
+operator_table: Dict[str, TokenType] = {
+    '+': TokenType.PLUS,
+    '-': TokenType.MINUS,
+    '*': TokenType.MULTIPLY,
+    '/': TokenType.DIVIDE,
+    '%': TokenType.MODULO,
+    '=': TokenType.ASSIGNMENT,
+    '!': TokenType.NOT,
+    '>': TokenType.GREATER_THAN,
+    '<': TokenType.LESS_THAN,
+    ',': TokenType.COMMA,
+    ';': TokenType.SEMICOLON,
+    '++': TokenType.INCREMENT,
+    '+=': TokenType.ASSIGNMENT_ADD,
+    '--': TokenType.DECREMENT,
+    '-=': TokenType.ASSIGNMENT_SUB,
+    '*=': TokenType.ASSIGNMENT_MUL,
+    '/=': TokenType.ASSIGNMENT_DIV,
+    '%=': TokenType.ASSIGNMENT_MOD,
+    '==': TokenType.EQUAL,
+    '!=': TokenType.NOT_EQUAL,
+    '>=': TokenType.GREATER_THAN_OR_EQUAL,
+    '<=': TokenType.LESS_THAN_OR_EQUAL,
+    '&&': TokenType.AND,
+    '||': TokenType.OR,
+}
+
+
+# Single characters that start a two character operator. At the end of the source code they are tokens on their own.
+incomplete_operator_table: Dict[str, TokenType] = {
+    '&': TokenType.AND,
+    '|': TokenType.OR,
+}
+
+
+# Number of characters read at a time by stream_tokens()
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+class ReferenceTokenizerRequired(Exception):
+    """
+        Raised by lex_chunks() on the inputs that only the reference tokenizer handles correctly.
+    """
+
+
+def lex_chunks(chunks: Iterable[str]) -> Iterator[List[Token]]:
+    """
+        Tokenize the source code, given as consecutive chunks of text, one whole lexeme at a time.
+        Yield the tokens in batches, as soon as they cannot be affected by the following chunks.
+
+        Raise ReferenceTokenizerRequired on the inputs that the reference tokenizer treats statefully:
+        stray backslashes, words starting with non-alphabetic numeric characters and numbers too long to be converted at once.
+        The tokens yielded before the exception are the same the reference tokenizer produces.
+    """
+    base_priority = 0
+    parenthesis_depth = 0
+
+    # Initialize the source code location at character 0, line 1
+    source_location = SourceCodeLocation(0, 1)
+
+    # Source code not tokenized yet and the index of its first character in the whole source code
+    buffer = ''
+    offset = 0
+
+    # Chunks of a string whose closing '"' has not been read yet. They are joined into the buffer once it is read
+    string_chunks: List[str] = []
+    # Index in the buffer right after the closing '"' of the string held back from the previous chunks
+    string_end = 0
+
+    chunks = iter(chunks)
+    is_end = False
+
+    while not is_end:
+
+        chunk = next(chunks, None)
+        if chunk is None:
+            # Everything left in the buffer is the end of the source code
+            is_end = True
+            if len(string_chunks) > 0:
+                buffer = ''.join(string_chunks)
+            limit = len(buffer)
+        else:
+            if len(string_chunks) > 0:
+                # Only the new chunk can close the string, so the start of the string is not scanned again
+                string_chunks.append(chunk)
+                closing = chunk.find('"')
+                if closing == -1:
+                    continue
+                buffer = ''.join(string_chunks)
+                string_chunks.clear()
+                string_end = len(buffer) - len(chunk) + closing + 1
+            else:
+                buffer += chunk
+            # Lexemes before a newline cannot continue in the next chunk, except for strings
+            limit = buffer.rfind('\n', string_end) + 1
+            if limit == 0:
+                continue
+        
+        # Position in the buffer from which to continue with the next chunk
+        resume = limit
+        is_string_held = False
+        tokens: List[Token] = []
+
+        for lexeme_match in lexeme_pattern.finditer(buffer, 0, limit):
+            kind = lexeme_match.lastgroup
+            lexeme = lexeme_match.group()
+
+            match kind:
+
+                case 'SPACE':
+                    pass
+
+                case 'WORD':
+                    word_type = get_keyword_type(lexeme)
+                    if word_type is None:
+                        # Words must start with a letter or an underscore
+                        if not lexeme[0].isalpha() and lexeme[0] != '_':
+                            raise ReferenceTokenizerRequired()
+                        tokens.append(Token(TokenType.IDENTIFIER, base_priority, source_location, lexeme))
+                    elif word_type == TokenType.BOOLEAN:
+                        tokens.append(Token(TokenType.BOOLEAN, base_priority, source_location, lexeme == 'true'))
+                    else:
+                        tokens.append(Token(word_type, base_priority, source_location))
+
+                case 'OPERATOR':
+                    tokens.append(Token(operator_table[lexeme], base_priority, source_location))
+
+                case 'NUMBER':
+                    try:
+                        value = int(lexeme)
+                    except ValueError:
+                        # The number exceeds the integer string conversion length limit
+                        raise ReferenceTokenizerRequired()
+                    tokens.append(Token(TokenType.NUMBER, base_priority, source_location, value))
+
+                case 'NEWLINE':
+                    # Upon a newline move to a new source location, shared by all the tokens of the line
+                    source_location = SourceCodeLocation(offset + lexeme_match.end(), source_location.line_number + 1)
+
+                case 'PARENTHESIS':
+                    if lexeme == '(':
+                        parenthesis_depth += 1
+                        tokens.append(Token(TokenType.PARENTHESIS, base_priority, source_location, '('))
+                        base_priority += MAX_PRIORITY
+                    else:
+                        parenthesis_depth -= 1
+                        base_priority -= MAX_PRIORITY
+                        tokens.append(Token(TokenType.PARENTHESIS, base_priority, source_location, ')'))
+
+                case 'SQUARE_BRACKET':
+                    if lexeme == '[':
+                        tokens.append(Token(TokenType.SQUARE_BRACKET, base_priority, source_location, '['))
+                        base_priority += MAX_PRIORITY
+                    else:
+                        base_priority -= MAX_PRIORITY
+                        tokens.append(Token(TokenType.SQUARE_BRACKET, base_priority, source_location, ']'))
+
+                case 'CURLY_BRACKET':
+                    tokens.append(Token(TokenType.CURLY_BRACKET, base_priority, source_location, lexeme))
+
+                case 'STRING':
+                    # Strings last until the next '"' or the end of the source code.
+                    # Newlines inside strings do not move the source location
+                    if len(lexeme) > 1 and lexeme[-1] == '"':
+                        value = lexeme[1:-1]
+                    elif is_end:
+                        value = lexeme[1:]
+                    else:
+                        # The string continues in the next chunk
+                        resume = lexeme_match.start()
+                        is_string_held = True
+                        break
+                    tokens.append(Token(TokenType.STRING, base_priority, source_location, value))
+
+                case 'COMMENT':
+                    pass
+
+                case 'OTHER':
+                    if lexeme == '\\':
+                        # A backslash that does not start a comment affects the following characters
+                        raise ReferenceTokenizerRequired()
+
+                    token_type = incomplete_operator_table.get(lexeme)
+                    if token_type is None:
+                        errors.unexpected_character(lexeme, source_location)
+                    
+                    # The language does not define single '&' and '|', except at the end of the source code
+                    end = lexeme_match.end()
+                    if end != limit:
+                        errors.unexpected_character(buffer[end], source_location)
+                    tokens.append(Token(token_type, base_priority, source_location))
+        
+        buffer = buffer[resume:]
+        offset += resume
+
+        string_end = 0
+        if is_string_held:
+            closing = buffer.find('"', 1)
+            if closing == -1:
+                # Hold the string back until a chunk closes it
+                string_chunks.append(buffer)
+                buffer = ''
+            else:
+                # The string is closed, but the line it ends on is not complete yet
+                string_end = closing + 1
+
+        # If the source code ended with an unclosed parenthesis, raise an error
+        if is_end and parenthesis_depth != 0:
+            errors.unbalanced_parentheses(source_location)
+
+        yield tokens
+
+
+def tokenize_source_code(source_code: str) -> List[Token]:
+    """
+        Tokenize the source code one whole lexeme at a time.
+        Produce the same tokens as reference_tokenize_source_code(), which is used for the inputs lex_chunks() does not handle.
+    """
+    tokens: List[Token] = []
+    try:
+        for batch in lex_chunks((source_code,)):
+            tokens.extend(batch)
+    except ReferenceTokenizerRequired:
+        return reference_tokenize_source_code(source_code)
+
+    return tokens
+
+
+def stream_tokens(file: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Token]:
+    """
+        Lazily tokenize the source code read from the file, chunk_size characters at a time.
+        Produce the same tokens as tokenize_source_code() without holding the whole source code in memory.
+        The file must be seekable, since the inputs lex_chunks() does not handle are tokenized again from the start by the reference tokenizer.
+    """
+    yielded_count = 0
+    try:
+        for batch in lex_chunks(iter(lambda: file.read(chunk_size), '')):
+            yield from batch
+            yielded_count += len(batch)
+
+    except ReferenceTokenizerRequired:
+        file.seek(0)
+        tokens = reference_tokenize_source_code(file.read())
+        yield from tokens[yielded_count:]
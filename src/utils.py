@@ -1,7 +1,14 @@
 import pathlib
+from typing import TextIO
 
 
 class SourceCodeLocation:
+    """
+        Location of a line of source code. 
+        Locations are never modified, so all the tokens on the same line share the same instance.
+    """
+
+    __slots__ = ('line_start', 'line_number')
 
     def __init__(self, line_start: int, line_number: int) -> None:
         self.line_start = line_start
@@ -22,3 +29,17 @@ def load_file(path: pathlib.Path) -> str:
         print(f'File not found: {path}')
         exit(1)
 
+
+def open_file(path: pathlib.Path) -> TextIO:
+    """
+    Opens a file from a given path for reading.
+    :param path: pathlib.Path
+    :return: TextIO
+    """
+    try:
+        return open(path, 'r')
+
+    except FileNotFoundError:
+        print(f'File not found: {path}')
+        exit(1)
+
@@ -1,23 +1,32 @@
-import copy
-from typing import Any, List, Tuple
+from typing import Any, Hashable, List, Tuple, Union
 
+import src.arrays as arrays
 import src.errors as errors
 import src.operations as operations
-from src.state import State
-from src.symbols import SymbolTable
+from src.compiler import CodeObject, OpCode
+from src.memo import FunctionMemo
+from src.symbols import SymbolTable, UserFunction
 from src.syntax_tree import SyntaxTree
-from src.token import Token, TokenType, is_literal_type
+from src.token import Token, TokenType, is_literal_type, operator_types
 
 
 class Processor:
 
-    def __init__(self) -> None:
+    def __init__(self, memo: Union[FunctionMemo, None] = None, verbose: bool = False) -> None:
         self.symbol_table = SymbolTable()
-        # Push the global scope.
-        self.symbol_table.push_scope()
+
+        # Results of the calls to pure user functions, if memoization is enabled
+        self.memo = memo
+
+        # Whether the tree walker prints the result of every statement
+        self.verbose = verbose
 
         self.loop_depth = 0
         self.should_continue_or_break = False
+
+        # Number of statements executed by the tree walker, and of instructions executed by the bytecode engine
+        self.executed_statements = 0
+        self.executed_instructions = 0
     
 
     def to_literals(self, tokens: List[Token]) -> List[Token]:
@@ -27,8 +36,7 @@ class Processor:
         literals: List[Token] = []
         for token in tokens:
             if token.type == TokenType.IDENTIFIER:
-                value, type = self.get_value_and_type(token)
-                literals.append(Token(type, 0, token.source_location, value))
+                literals.append(self.symbol_table.get_symbol(token))
             else:
                 literals.append(token)
         
@@ -48,11 +56,244 @@ class Processor:
     
     def interpret_tree(self, syntax_tree: SyntaxTree) -> None:
         """
-            Interpret the given syntax tree.
+            Interpret the given, resolved, syntax tree.
         """
+        self.symbol_table.set_global_layout(syntax_tree.layout)
         self.interpret_statements(syntax_tree.statements)
+
+
+    def execute_bytecode(self, code: CodeObject) -> None:
+        """
+            Execute the main code object of a compiled program.
+        """
+        self.symbol_table.set_global_layout(code.layout)
+        self.execute_code(code)
     
 
+    def execute_code(self, code: CodeObject) -> Union[Token, None]:
+        """
+            Execute the given code object in the current scope with a stack-based dispatch loop.
+            Return the value of the RETURN_VALUE instruction, if any.
+
+            Calls to user functions do not recurse into this method: the state of the caller is saved on an explicit call stack
+            and the callee runs in the same loop, so that the depth of recursion is only limited by memory.
+            Tail calls replace the frame of the caller instead of saving it.
+        """
+        opcodes = code.opcodes
+        operands = code.operands
+        instruction_count = len(opcodes)
+        stack: List[Token] = []
+        # Frame of the code being executed, which changes only when a function is called or returns
+        frame = self.symbol_table.frame
+        pc = 0
+
+        # Callers of the code being executed, the outermost first, with their resume index and evaluation stack
+        callers: List[Tuple[CodeObject, int, List[Token], Union[Hashable, None]]] = []
+        # Memo key of the call being executed, if its result is to be memoized
+        memo_key: Union[Hashable, None] = None
+
+        # Instructions executed by this call, added to the total when it ends, however it ends
+        executed = 0
+        try:
+            while pc < instruction_count:
+                opcode = opcodes[pc]
+                operand = operands[pc]
+                pc += 1
+                executed += 1
+
+                match opcode:
+
+                    case OpCode.LOAD_SLOT:
+                        value = frame[operand.slot]
+                        if value is None:
+                            errors.undefined_identifier(operand.value, operand.source_location)
+                        stack.append(value)
+
+
+                    case OpCode.PUSH_CONST:
+                        stack.append(operand)
+
+
+                    case OpCode.BINARY_OP:
+                        operation, result_type, operator = operand
+                        value2 = stack.pop()
+                        value1 = stack[-1]
+                        result = operation(value1.value, value1.type, value2.value, value2.type, operator)
+                        stack[-1] = Token(result_type or value1.type, 0, operator.source_location, result)
+
+
+                    case OpCode.POP_JUMP_IF_NOT_TRUE:
+                        condition = stack.pop()
+                        if condition.type != TokenType.BOOLEAN or condition.value != True:
+                            pc = operand
+
+
+                    case OpCode.JUMP:
+                        pc = operand
+
+
+                    case OpCode.JUMP_IF_FALSE:
+                        condition = stack[-1]
+                        if condition.type == TokenType.BOOLEAN and condition.value == False:
+                            pc = operand
+
+
+                    case OpCode.JUMP_IF_TRUE:
+                        condition = stack[-1]
+                        if condition.type == TokenType.BOOLEAN and condition.value == True:
+                            pc = operand
+
+
+                    case OpCode.POP_TOP:
+                        stack.pop()
+
+
+                    case OpCode.STORE_SLOT:
+                        frame[operand.slot] = stack[-1]
+
+
+                    case OpCode.INCREMENT_NAME:
+                        operation, identifier, operator = operand
+                        symbol = self.symbol_table.get_symbol(identifier)
+                        new_value = Token(TokenType.NUMBER, 0, operator.source_location, operation(symbol.value, symbol.type, operator))
+                        frame[identifier.slot] = new_value
+                        stack.append(new_value)
+
+
+                    case OpCode.AUGMENTED_ASSIGN:
+                        operation, identifier, operator = operand
+                        value = stack[-1]
+                        symbol = self.symbol_table.get_symbol(identifier)
+                        new_value = Token(symbol.type, 0, operator.source_location, operation(symbol.value, symbol.type, value.value, value.type, operator))
+                        frame[identifier.slot] = new_value
+                        stack[-1] = new_value
+
+
+                    case OpCode.UNARY_OP:
+                        operation, result_type, operator = operand
+                        value = stack[-1]
+                        stack[-1] = Token(result_type, 0, operator.source_location, operation(value.value, value.type, operator))
+
+
+                    case OpCode.INDEX_ARRAY:
+                        index = stack.pop()
+                        array = stack[-1]
+                        stack[-1] = operations.array_index(array.value, array.type, index.value, index.type, operand)
+
+
+                    case OpCode.BUILD_ARRAY:
+                        count, array = operand
+                        elements = stack[len(stack) - count:]
+                        del stack[len(stack) - count:]
+                        stack.append(Token(TokenType.ARRAY, 0, array.source_location, arrays.pack(elements)))
+
+
+                    case OpCode.CALL_FUNCTION | OpCode.TAIL_CALL_FUNCTION:
+                        identifier_token, argument_count, caller = operand
+                        arguments = stack[len(stack) - argument_count:]
+                        del stack[len(stack) - argument_count:]
+
+                        builtin_handler = operations.get_builtin_handler(identifier_token.value)
+                        if builtin_handler is not None:
+                            stack.append(self.call_builtin(builtin_handler, identifier_token, arguments, caller))
+                            continue
+
+                        function = self.get_user_function(identifier_token, arguments, caller)
+
+                        key = None
+                        if self.memo is not None:
+                            key = self.memo.make_key(function, arguments)
+                            if key is not None:
+                                return_value = self.memo.get(key)
+                                if return_value is not None:
+                                    stack.append(return_value)
+                                    continue
+
+                        # The result of a tail call is the result of the caller, unless the result of the caller is to be memoized
+                        if opcode == OpCode.TAIL_CALL_FUNCTION and len(callers) > 0 and memo_key is None:
+                            self.symbol_table.pop_frame()
+                        else:
+                            callers.append((code, pc, stack, memo_key))
+
+                        code = function.value
+                        self.symbol_table.push_frame(code.layout, arguments)
+                        opcodes = code.opcodes
+                        operands = code.operands
+                        instruction_count = len(opcodes)
+                        stack = []
+                        frame = self.symbol_table.frame
+                        pc = 0
+                        memo_key = key
+
+
+                    case OpCode.MISSING_OPERANDS:
+                        errors.missing_operands(operand.type, operand.source_location)
+
+
+                    case OpCode.DECLARE_FUNCTION:
+                        identifier_token, function_code = operand
+                        frame[identifier_token.slot] = Token(TokenType.FUNCTION, 0, None, function_code)
+
+
+                    case OpCode.RETURN_VALUE:
+                        return_value = stack.pop()
+                        if len(callers) == 0:
+                            return return_value
+
+                        self.symbol_table.pop_frame()
+                        if memo_key is not None:
+                            self.memo.store(memo_key, return_value)
+
+                        code, pc, stack, memo_key = callers.pop()
+                        opcodes = code.opcodes
+                        operands = code.operands
+                        instruction_count = len(opcodes)
+                        frame = self.symbol_table.frame
+                        stack.append(return_value)
+
+        finally:
+            self.executed_instructions += executed
+
+        return None
+
+
+    def call_builtin(self, builtin_handler: operations.BuiltinFunction, identifier_token: Token, arguments: List[Token], caller: Token) -> Token:
+        """
+            Call a built-in function with already evaluated arguments.
+        """
+        # Parameter list will just be used to check if the number of arguments is correct
+        parameter_list = builtin_handler.supported_argument_types
+        if len(arguments) != len(parameter_list):
+            errors.wrong_argument_count(
+                identifier_token.value,
+                len(parameter_list),
+                len(arguments),
+                caller.source_location
+            )
+
+        return builtin_handler.call(arguments, caller)
+
+
+    def get_user_function(self, identifier_token: Token, arguments: List[Token], caller: Token) -> Token:
+        """
+            Return the compiled user function called by the given identifier, checking that it can be called with the given arguments.
+        """
+        function = self.symbol_table.get_symbol(identifier_token)
+        if function.type != TokenType.FUNCTION:
+            errors.type_error((TokenType.FUNCTION,), function.type, caller.type, caller.source_location)
+
+        code: CodeObject = function.value
+        if len(arguments) != len(code.parameters):
+            errors.wrong_argument_count(
+                identifier_token.value,
+                len(code.parameters),
+                len(arguments),
+                caller.source_location
+            )
+
+        return function
+
+
     def interpret_statements(self, statements: List[Token]) -> None:
         for statement in statements:
 
@@ -60,9 +301,10 @@ class Processor:
             if self.should_continue_or_break:
                 break
 
-            result = self.interpret_statement(copy.deepcopy(statement))
+            result = self.interpret_statement(statement)
+            self.executed_statements += 1
 
-            if State.verbose:
+            if self.verbose:
                 print(result)
 
             # In case of continue statements, go back to condition evaluation in the WHILE handler.
@@ -74,6 +316,10 @@ class Processor:
 
 
     def interpret_statement(self, root: Token) -> Token:
+        """
+            Evaluate the given statement and return its result as a new token.
+            The syntax tree is never modified, so that statements can be executed repeatedly without copying them.
+        """
         
         # Don't mind executing literals, except arrays. 
         # Arrays have to check their elements for identifiers at declaration.
@@ -81,214 +327,203 @@ class Processor:
             or root.type == TokenType.IDENTIFIER:
             return root
 
+        # Operators left without operands by the parser
+        if not root.children and root.type in operator_types:
+            errors.missing_operands(root.type, root.source_location)
+
         # Interpret the statement recursively.
-        if root.type not in (TokenType.IF, TokenType.WHILE):
-            for index, child in enumerate(root.children):
-                root.children[index] = self.interpret_statement(child)
+        # Logical operators evaluate their operands lazily.
+        if root.type not in (TokenType.IF, TokenType.WHILE, TokenType.AND, TokenType.OR):
+            operands = [self.interpret_statement(child) for child in root.children]
 
         match root.type:
 
             case TokenType.PLUS:
-                value1, type1 = self.get_value_and_type(root.children[0])
-                value2, type2 = self.get_value_and_type(root.children[1])
-                root.value = operations.add(value1, type1, value2, type2, root)
-                root.type = type1
+                value1, type1 = self.get_value_and_type(operands[0])
+                value2, type2 = self.get_value_and_type(operands[1])
+                return Token(type1, 0, root.source_location, operations.add(value1, type1, value2, type2, root))
             
 
             case TokenType.MINUS:
-                value1, type1 = self.get_value_and_type(root.children[0])
-                value2, type2 = self.get_value_and_type(root.children[1])
-                root.value = operations.subtract(value1, type1, value2, type2, root)
-                root.type = TokenType.NUMBER
+                value1, type1 = self.get_value_and_type(operands[0])
+                value2, type2 = self.get_value_and_type(operands[1])
+                return Token(TokenType.NUMBER, 0, root.source_location, operations.subtract(value1, type1, value2, type2, root))
             
 
             case TokenType.MULTIPLY:
-                value1, type1 = self.get_value_and_type(root.children[0])
-                value2, type2 = self.get_value_and_type(root.children[1])
-                root.value = operations.multiply(value1, type1, value2, type2, root)
-                root.type = TokenType.NUMBER
+                value1, type1 = self.get_value_and_type(operands[0])
+                value2, type2 = self.get_value_and_type(operands[1])
+                return Token(TokenType.NUMBER, 0, root.source_location, operations.multiply(value1, type1, value2, type2, root))
             
 
             case TokenType.DIVIDE:
-                value1, type1 = self.get_value_and_type(root.children[0])
-                value2, type2 = self.get_value_and_type(root.children[1])
-                root.value = operations.divide(value1, type1, value2, type2, root)
-                root.type = TokenType.NUMBER
+                value1, type1 = self.get_value_and_type(operands[0])
+                value2, type2 = self.get_value_and_type(operands[1])
+                return Token(TokenType.NUMBER, 0, root.source_location, operations.divide(value1, type1, value2, type2, root))
             
 
             case TokenType.MODULO:
-                value1, type1 = self.get_value_and_type(root.children[0])
-                value2, type2 = self.get_value_and_type(root.children[1])
-                root.value = operations.modulo(value1, type1, value2, type2, root)
-                root.type = TokenType.NUMBER
+                value1, type1 = self.get_value_and_type(operands[0])
+                value2, type2 = self.get_value_and_type(operands[1])
+                return Token(TokenType.NUMBER, 0, root.source_location, operations.modulo(value1, type1, value2, type2, root))
 
 
             case TokenType.INCREMENT:
                 identifier = root.children[0]
                 symbol = self.symbol_table.get_symbol(identifier)
-                
-                new_value = operations.increment(symbol.value, symbol.type, root)
-                
-                self.symbol_table.set_symbol_value(identifier.value, new_value)
-                root.value = symbol.value
-                root.type = TokenType.NUMBER
+
+                new_value = Token(TokenType.NUMBER, 0, root.source_location, operations.increment(symbol.value, symbol.type, root))
+
+                self.symbol_table.set_symbol(identifier, new_value)
+                return new_value
             
 
             case TokenType.DECREMENT:
                 identifier = root.children[0]
-                symbol = self.symbol_table.get_symbol(root.children[0])
+                symbol = self.symbol_table.get_symbol(identifier)
 
-                new_value = operations.decrement(symbol.value, symbol.type, root)
+                new_value = Token(TokenType.NUMBER, 0, root.source_location, operations.decrement(symbol.value, symbol.type, root))
 
-                self.symbol_table.set_symbol_value(identifier.value, new_value)
-                root.value = symbol.value
-                root.type = TokenType.NUMBER
+                self.symbol_table.set_symbol(identifier, new_value)
+                return new_value
 
 
             case TokenType.EQUAL:
-                value1, type1 = self.get_value_and_type(root.children[0])
-                value2, type2 = self.get_value_and_type(root.children[1])
-                root.value = operations.equal(value1, type1, value2, type2, root)
-                root.type = TokenType.BOOLEAN
+                value1, type1 = self.get_value_and_type(operands[0])
+                value2, type2 = self.get_value_and_type(operands[1])
+                return Token(TokenType.BOOLEAN, 0, root.source_location, operations.equal(value1, type1, value2, type2, root))
             
 
             case TokenType.NOT_EQUAL:
-                value1, type1 = self.get_value_and_type(root.children[0])
-                value2, type2 = self.get_value_and_type(root.children[1])
-                root.value = operations.not_equal(value1, type1, value2, type2, root)
-                root.type = TokenType.BOOLEAN
+                value1, type1 = self.get_value_and_type(operands[0])
+                value2, type2 = self.get_value_and_type(operands[1])
+                return Token(TokenType.BOOLEAN, 0, root.source_location, operations.not_equal(value1, type1, value2, type2, root))
 
 
             case TokenType.GREATER_THAN:
-                value1, type1 = self.get_value_and_type(root.children[0])
-                value2, type2 = self.get_value_and_type(root.children[1])
-                root.value = operations.greater_than(value1, type1, value2, type2, root)
-                root.type = TokenType.BOOLEAN
+                value1, type1 = self.get_value_and_type(operands[0])
+                value2, type2 = self.get_value_and_type(operands[1])
+                return Token(TokenType.BOOLEAN, 0, root.source_location, operations.greater_than(value1, type1, value2, type2, root))
 
 
             case TokenType.LESS_THAN:
-                value1, type1 = self.get_value_and_type(root.children[0])
-                value2, type2 = self.get_value_and_type(root.children[1])
-                root.value = operations.less_than(value1, type1, value2, type2, root)
-                root.type = TokenType.BOOLEAN
+                value1, type1 = self.get_value_and_type(operands[0])
+                value2, type2 = self.get_value_and_type(operands[1])
+                return Token(TokenType.BOOLEAN, 0, root.source_location, operations.less_than(value1, type1, value2, type2, root))
 
 
             case TokenType.GREATER_THAN_OR_EQUAL:
-                value1, type1 = self.get_value_and_type(root.children[0])
-                value2, type2 = self.get_value_and_type(root.children[1])
-                root.value = operations.greater_than_or_equal(value1, type1, value2, type2, root)
-                root.type = TokenType.BOOLEAN
+                value1, type1 = self.get_value_and_type(operands[0])
+                value2, type2 = self.get_value_and_type(operands[1])
+                return Token(TokenType.BOOLEAN, 0, root.source_location, operations.greater_than_or_equal(value1, type1, value2, type2, root))
 
 
             case TokenType.LESS_THAN_OR_EQUAL:
-                value1, type1 = self.get_value_and_type(root.children[0])
-                value2, type2 = self.get_value_and_type(root.children[1])
-                root.value = operations.less_than_or_equal(value1, type1, value2, type2, root)
-                root.type = TokenType.BOOLEAN
+                value1, type1 = self.get_value_and_type(operands[0])
+                value2, type2 = self.get_value_and_type(operands[1])
+                return Token(TokenType.BOOLEAN, 0, root.source_location, operations.less_than_or_equal(value1, type1, value2, type2, root))
 
             case TokenType.AND:
-                value1, type1 = self.get_value_and_type(root.children[0])
-                value2, type2 = self.get_value_and_type(root.children[1])
-                root.value = operations.and_(value1, type1, value2, type2, root)
-                root.type = TokenType.BOOLEAN
+                value1, type1 = self.get_value_and_type(self.interpret_statement(root.children[0]))
+                # A false first operand decides the result, so the second operand is not evaluated.
+                # Other first operands are type checked together with the second operand, as usual.
+                if type1 == TokenType.BOOLEAN and value1 == False:
+                    return Token(TokenType.BOOLEAN, 0, root.source_location, False)
+                value2, type2 = self.get_value_and_type(self.interpret_statement(root.children[1]))
+                return Token(TokenType.BOOLEAN, 0, root.source_location, operations.and_(value1, type1, value2, type2, root))
 
 
             case TokenType.OR:
-                value1, type1 = self.get_value_and_type(root.children[0])
-                value2, type2 = self.get_value_and_type(root.children[1])
-                root.value = operations.or_(value1, type1, value2, type2, root)
-                root.type = TokenType.BOOLEAN
+                value1, type1 = self.get_value_and_type(self.interpret_statement(root.children[0]))
+                # A true first operand decides the result, so the second operand is not evaluated
+                if type1 == TokenType.BOOLEAN and value1 == True:
+                    return Token(TokenType.BOOLEAN, 0, root.source_location, True)
+                value2, type2 = self.get_value_and_type(self.interpret_statement(root.children[1]))
+                return Token(TokenType.BOOLEAN, 0, root.source_location, operations.or_(value1, type1, value2, type2, root))
 
 
             case TokenType.NOT:
-                value1, type1 = self.get_value_and_type(root.children[0])
-                root.value = operations.not_(value1, type1, root)
-                root.type = TokenType.BOOLEAN
+                value1, type1 = self.get_value_and_type(operands[0])
+                return Token(TokenType.BOOLEAN, 0, root.source_location, operations.not_(value1, type1, root))
 
 
             case TokenType.ASSIGNMENT:
-                value_token = root.children[0]
-                value, type = self.get_value_and_type(value_token)
-                value_token.value = value
-                value_token.type = type
+                value_token = operands[0]
+                if value_token.type == TokenType.IDENTIFIER:
+                    # Values are immutable, so the value of the other symbol can be shared
+                    value_token = self.symbol_table.get_symbol(value_token)
                 identifier = root.children[1]
 
-                self.symbol_table.set_symbol(identifier.value, value_token)
-                root.value = value
-                root.type = type
+                self.symbol_table.set_symbol(identifier, value_token)
+                return value_token
 
 
             case TokenType.ASSIGNMENT_ADD:
-                value, type = self.get_value_and_type(root.children[0])
+                value, type = self.get_value_and_type(operands[0])
 
                 identifier = root.children[1]
                 symbol = self.symbol_table.get_symbol(identifier)
 
-                new_value = operations.add(symbol.value, symbol.type, value, type, root)
+                new_value = Token(symbol.type, 0, root.source_location, operations.add(symbol.value, symbol.type, value, type, root))
 
-                self.symbol_table.set_symbol_value(identifier.value, new_value)
-                root.value = symbol.value
-                root.type = type
+                self.symbol_table.set_symbol(identifier, new_value)
+                return new_value
 
 
             case TokenType.ASSIGNMENT_SUB:
-                value, type = self.get_value_and_type(root.children[0])
+                value, type = self.get_value_and_type(operands[0])
 
                 identifier = root.children[1]
                 symbol = self.symbol_table.get_symbol(identifier)
 
-                new_value = operations.subtract(symbol.value, symbol.type, value, type, root)
+                new_value = Token(symbol.type, 0, root.source_location, operations.subtract(symbol.value, symbol.type, value, type, root))
 
-                self.symbol_table.set_symbol_value(identifier.value, new_value)
-                root.value = symbol.value
-                root.type = type
+                self.symbol_table.set_symbol(identifier, new_value)
+                return new_value
 
 
             case TokenType.ASSIGNMENT_MUL:
-                value, type = self.get_value_and_type(root.children[0])
+                value, type = self.get_value_and_type(operands[0])
 
                 identifier = root.children[1]
                 symbol = self.symbol_table.get_symbol(identifier)
 
-                new_value = operations.multiply(symbol.value, symbol.type, value, type, root)
+                new_value = Token(symbol.type, 0, root.source_location, operations.multiply(symbol.value, symbol.type, value, type, root))
 
-                self.symbol_table.set_symbol_value(identifier.value, new_value)
-                root.value = symbol.value
-                root.type = type
+                self.symbol_table.set_symbol(identifier, new_value)
+                return new_value
 
 
             case TokenType.ASSIGNMENT_DIV:
-                value, type = self.get_value_and_type(root.children[0])
+                value, type = self.get_value_and_type(operands[0])
 
                 identifier = root.children[1]
                 symbol = self.symbol_table.get_symbol(identifier)
 
-                new_value = operations.divide(symbol.value, symbol.type, value, type, root)
+                new_value = Token(symbol.type, 0, root.source_location, operations.divide(symbol.value, symbol.type, value, type, root))
 
-                self.symbol_table.set_symbol_value(identifier.value, new_value)
-                root.value = symbol.value
-                root.type = type
+                self.symbol_table.set_symbol(identifier, new_value)
+                return new_value
 
 
             case TokenType.ASSIGNMENT_MOD:
-                value, type = self.get_value_and_type(root.children[0])
+                value, type = self.get_value_and_type(operands[0])
 
                 identifier = root.children[1]
                 symbol = self.symbol_table.get_symbol(identifier)
 
-                new_value = operations.mod(symbol.value, symbol.type, value, type, root)
+                new_value = Token(symbol.type, 0, root.source_location, operations.modulo(symbol.value, symbol.type, value, type, root))
 
-                self.symbol_table.set_symbol_value(identifier.value, new_value)
-                root.value = symbol.value
-                root.type = type
+                self.symbol_table.set_symbol(identifier, new_value)
+                return new_value
             
 
             case TokenType.IF:
                 body = root.children[0]
                 condition = root.children[1]
 
-                condition_value = self.interpret_statement(copy.deepcopy(condition))
-                if condition_value.type == TokenType.BOOLEAN and condition_value.value == True:
+                condition_value, condition_type = self.get_value_and_type(self.interpret_statement(condition))
+                if condition_type == TokenType.BOOLEAN and condition_value == True:
                     # Condition is true, so execute the if statement body
                     self.interpret_statements(body.children)
                 else:
@@ -310,9 +545,9 @@ class Processor:
                 while self.loop_depth == current_loop_depth:
 
                     # Evaluate the condition
-                    condition_value = self.interpret_statement(copy.deepcopy(condition))
+                    condition_value, condition_type = self.get_value_and_type(self.interpret_statement(condition))
 
-                    if condition_value.type == TokenType.BOOLEAN and condition_value.value == True:
+                    if condition_type == TokenType.BOOLEAN and condition_value == True:
                         # Condition is true, so execute the while statement body
                         self.should_continue_or_break = False
                         self.interpret_statements(body.children)
@@ -335,28 +570,21 @@ class Processor:
             
 
             case TokenType.PARENTHESIS:
-                root = root.children[0]
+                return operands[0]
             
 
             case TokenType.FUNCTION_DECLARATION:
-                body_token: Token = root.value[0]
-                parameters_token_list: List[Token] = root.value[1]
                 identifier_token: Token = root.value[2]
 
-                # Create a new function token to store the newly declared function
-                # Function token format: [[arguments], [function_body_statements]]
-                # Data types:            [List[str],   List[Token]               ]    
-                function = Token(TokenType.FUNCTION, 0, None)
-
-                parameter_list: List[str] = [parameter.value for parameter in parameters_token_list]
-
-                function.value = [parameter_list, body_token.children]
+                # The function was prepared by the resolver, so declaring it only binds it to its name
+                function = Token(TokenType.FUNCTION, 0, None, root.value[4])
 
-                self.symbol_table.set_symbol(identifier_token.value, function)
+                self.symbol_table.set_symbol(identifier_token, function)
             
 
             case TokenType.FUNCTION_CALL:
-                arguments_token_list: List[Token] = root.value[0]
+                # The evaluated arguments, root.value[0] holds the argument expressions
+                arguments_token_list: List[Token] = operands
                 identifier_token: Token = root.value[1]
 
                 # Check if the function has a built-in handler
@@ -368,8 +596,10 @@ class Processor:
                 else:
                     # Get the function from the symbol table
                     function = self.symbol_table.get_symbol(identifier_token)
-                    parameter_list: List[str] = function.value[0]
-                    statements: List[Token] = function.value[1]
+                    if function.type != TokenType.FUNCTION:
+                        errors.type_error((TokenType.FUNCTION,), function.type, root.type, root.source_location)
+                    user_function: UserFunction = function.value
+                    parameter_list: List[int] = user_function.layout.parameter_slots
 
                 # Check if the number of arguments matches the number of arguments in the function
                 if len(arguments_token_list) != len(parameter_list):
@@ -380,65 +610,61 @@ class Processor:
                         root.source_location
                     )
 
-                if builtin_handler is not None:
-                    argument_literals = self.to_literals(arguments_token_list)
-                    root = builtin_handler.call(argument_literals, root)
-                else:
-                    # Before pushing the new scope to the stack, retrieve eventual symbols from the previous scope
-                    argument_literals = self.to_literals(arguments_token_list)
-
-                    # Push the new scope to the stack
-                    self.symbol_table.push_scope()
+                # Before pushing the new scope to the stack, retrieve eventual symbols from the previous scope
+                argument_literals = self.to_literals(arguments_token_list)
 
-                    # Declare the arguments in the new scope
-                    for identifier, argument in zip(parameter_list, argument_literals):
-                        self.symbol_table.set_symbol(identifier, argument)
-                    
-                    # Extract the return statement from the function body, it will be executed at the end of the function
-                    # The return statement is guaranteed to be the first statement in the function body by the SyntaxTree class parser
-                    return_statement = statements[0]
+                if builtin_handler is not None:
+                    return builtin_handler.call(argument_literals, root)
+
+                if self.memo is not None:
+                    key = self.memo.make_key(function, argument_literals)
+                    if key is not None:
+                        return_value = self.memo.get(key)
+                        if return_value is not None:
+                            return return_value
+
+                # Push the new scope to the stack, declaring the arguments in it
+                self.symbol_table.push_frame(user_function.layout, argument_literals)
+
+                # Execute the function body, then the return expression, which is evaluated at the end of the function
+                try:
+                    self.interpret_statements(user_function.body)
+                    return_value = self.interpret_statement(user_function.return_expression)
+                except RecursionError:
+                    # Raised in the innermost calls, where the stack is exhausted, and reported at the call that has room left for it
+                    errors.recursion_too_deep(identifier_token.value, root.source_location)
+                if return_value.type == TokenType.IDENTIFIER:
+                    return_value = self.symbol_table.get_symbol(return_value)
 
-                    # Execute the function body, excluding the return statement
-                    # Don't directly modify the statements list, as it may be used in later function calls
-                    self.interpret_statements(statements[1:])
+                # Pop the scope from the stack
+                self.symbol_table.pop_frame()
 
-                    # Execute the return statement and set the function call token to the return value
-                    root = self.interpret_statement(return_statement)
+                if self.memo is not None and key is not None:
+                    self.memo.store(key, return_value)
 
-                    # Pop the scope from the stack
-                    self.symbol_table.pop_scope()
+                return return_value
 
             
             case TokenType.RETURN:
-                return_value = root.children[0]
+                return_value = operands[0]
                 if return_value.type == TokenType.IDENTIFIER:
                     # Get the value of the identifier
-                    symbol = self.symbol_table.get_symbol(return_value)
-                    root = Token(symbol.type, 0, root.source_location, symbol.value)
+                    return self.symbol_table.get_symbol(return_value)
                 
-                elif return_value.type == TokenType.ARRAY:
-                    # Recursively get all the literal values of the array
-                    root = Token(TokenType.ARRAY, 0, root.source_location, self.to_literals(return_value.children))
-                
-                else:
-                    # If the return value is a single literal token, just return it as it is
-                    root = return_value
+                # Evaluated arrays already hold literal values, and single literal tokens are returned as they are
+                return return_value
             
 
             case TokenType.ARRAY_INDEXING:
-                array, array_type = self.get_value_and_type(root.children[0])
-                index, index_type = self.get_value_and_type(root.children[1])
+                array, array_type = self.get_value_and_type(operands[0])
+                index, index_type = self.get_value_and_type(operands[1])
 
-                root = operations.array_index(array, array_type, index, index_type, root)
+                return operations.array_index(array, array_type, index, index_type, root)
 
 
             case TokenType.ARRAY:
-                content: List[Token] = root.value
-                for element in content:
-                    if element.type == TokenType.IDENTIFIER:
-                        element_value, element_type = self.get_value_and_type(element)
-                        element.type = element_type
-                        element.value = element_value
+                # Build a new array from the evaluated elements, replacing identifiers with their values
+                return Token(TokenType.ARRAY, 0, root.source_location, arrays.pack(self.to_literals(operands)))
         
 
         return root